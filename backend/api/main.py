@@ -3,7 +3,11 @@
 from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 import asyncio
+import atexit
 import json
+import logging
+import logging.handlers
+import queue
 import time
 from fastapi.responses import FileResponse
 from pathlib import Path
@@ -23,6 +27,20 @@ from .schemas import (
     CrawlerConfigRequest, CompileTestsRequest, CompileTestsResponse, RunTestsResponse
 )
 
+# Surface backend module loggers alongside the API's console output. Records go
+# through a queue so console I/O happens on a listener thread, not the event loop.
+_log_queue = queue.SimpleQueue()
+_log_listener = logging.handlers.QueueListener(_log_queue, logging.StreamHandler())
+logging.basicConfig(
+    level=logging.WARNING,
+    format="%(message)s",
+    handlers=[logging.handlers.QueueHandler(_log_queue)],
+)
+# INFO for our own modules only; third-party loggers such as httpx (one line per request) stay at WARNING
+logging.getLogger("backend").setLevel(logging.INFO)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
 # Initialize config
 config = get_config()
 
@@ -86,7 +104,11 @@ async def websocket_crawl(websocket: WebSocket, crawl_session_id: str):
         await websocket.send_json({"type": "crawl_start", "url": url})
         
         # Initialize GraphDB and embeddings
-        graph_db = GraphDB(config.neo4j.uri, config.neo4j.user, config.neo4j.password)
+        graph_db = GraphDB(
+            config.neo4j.uri, config.neo4j.user, config.neo4j.password,
+            max_connection_pool_size=config.neo4j.max_connection_pool_size,
+            max_connection_lifetime=config.neo4j.max_connection_lifetime,
+        )
         
         try:
             from backend.shared.embeddings import get_embedding_generator
@@ -107,8 +129,8 @@ async def websocket_crawl(websocket: WebSocket, crawl_session_id: str):
             config.crawler.max_pages = crawler_settings.get("max_pages", config.crawler.max_pages)
             config.crawler.timeout = crawler_settings.get("timeout", config.crawler.timeout)
             config.crawler.screenshot = crawler_settings.get("screenshot", config.crawler.screenshot)
-            config.crawler.page_delay_ms = crawler_settings.get("page_delay_ms", getattr(config.crawler, "page_delay_ms", 300))
-            config.crawler.skip_embeddings = crawler_settings.get("skip_embeddings", getattr(config.crawler, "skip_embeddings", True))
+            config.crawler.page_delay_ms = crawler_settings.get("page_delay_ms", config.crawler.page_delay_ms)
+            config.crawler.skip_embeddings = crawler_settings.get("skip_embeddings", config.crawler.skip_embeddings)
         
         # Set progress callback to send updates via WebSocket
         async def progress_callback(update: dict):
@@ -174,7 +196,11 @@ async def crawl_website(request: CrawlRequest):
     try:
         # Initialize GraphDB connection
         print("📊 API: Connecting to Neo4j...")
-        graph_db = GraphDB(config.neo4j.uri, config.neo4j.user, config.neo4j.password)
+        graph_db = GraphDB(
+            config.neo4j.uri, config.neo4j.user, config.neo4j.password,
+            max_connection_pool_size=config.neo4j.max_connection_pool_size,
+            max_connection_lifetime=config.neo4j.max_connection_lifetime,
+        )
         print("✅ API: Neo4j connection established")
         
         # Initialize embeddings
@@ -712,8 +738,8 @@ async def get_crawler_config():
             "max_pages": config.crawler.max_pages,
             "timeout": config.crawler.timeout,
             "screenshot": config.crawler.screenshot,
-            "page_delay_ms": getattr(config.crawler, "page_delay_ms", 300),
-            "skip_embeddings": getattr(config.crawler, "skip_embeddings", True)
+            "page_delay_ms": config.crawler.page_delay_ms,
+            "skip_embeddings": config.crawler.skip_embeddings
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get crawler config: {str(e)}")
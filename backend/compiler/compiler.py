@@ -1,16 +1,35 @@
 """Compile JSON test cases into Playwright TypeScript specs."""
 
+import logging
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from io import StringIO
 from pathlib import Path
 from typing import List
 from backend.shared.types import TestSuite, TestCase, TestStep, ActionType, SelectorStrategy
 from backend.shared.config import get_config
 from .templates import (
-    TEST_FILE_TEMPLATE,
+    TEST_FILE_HEAD_TEMPLATE,
+    TEST_FILE_TAIL,
     TEST_CASE_TEMPLATE,
     TEST_STEP_TEMPLATES,
-    SELECTOR_TEMPLATES,
+    SELECTOR_BUILDERS,
 )
 
+logger = logging.getLogger(__name__)
+
+# Precompiled patterns for selector normalization and inference
+_TEXT_LINK_RE = re.compile(r"a:text\(['\"](.+?)['\"]\)")
+_PLAIN_TEXT_RE = re.compile(r'^[a-zA-Z\s]+$')
+
+
+def _esc(text: str) -> str:
+    """Escape single quotes for embedding in a TypeScript string literal."""
+    if "'" not in text:
+        return text
+    return text.replace("'", "\\'")
+
 
 class TestCompiler:
     """Compiles JSON test cases into executable Playwright TypeScript specs."""
@@ -20,26 +39,33 @@ class TestCompiler:
 
     def compile(self, test_suite: TestSuite) -> Path:
         """Compile a test suite into a Playwright spec file."""
-        print(f"Compiling test suite: {test_suite.name}")
-
-        # Generate test cases code
-        test_cases_code = []
-        for test_case in test_suite.test_cases:
-            test_code = self._compile_test_case(test_case)
-            test_cases_code.append(test_code)
+        logger.info("Compiling test suite: %s", test_suite.name)
 
         # Generate complete file
-        file_content = TEST_FILE_TEMPLATE.format(
-            base_url=test_suite.base_url,
-            test_cases="\n\n".join(test_cases_code),
-        )
+        buf = StringIO()
+        buf.write(TEST_FILE_HEAD_TEMPLATE.format(base_url=test_suite.base_url))
+        for i, test_case in enumerate(test_suite.test_cases):
+            if i:
+                buf.write("\n\n")
+            buf.write(self._compile_test_case(test_case))
+        buf.write(TEST_FILE_TAIL)
+        file_content = buf.getvalue()
 
         # Save to file
         output_path = self._save_spec_file(test_suite.suite_id, file_content)
-        print(f"Compiled spec saved to: {output_path}")
+        logger.info("Compiled spec saved to: %s", output_path)
 
         return output_path
 
+    def compile_many(self, test_suites: List[TestSuite]) -> List[Path]:
+        """Compile several test suites in parallel worker processes."""
+        if len(test_suites) <= 1:
+            return [self.compile(suite) for suite in test_suites]
+
+        workers = min(len(test_suites), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(_compile_one, test_suites))
+
     def _compile_test_case(self, test_case: TestCase) -> str:
         """Compile a single test case."""
         # Generate steps code
@@ -83,18 +109,13 @@ class TestCompiler:
             if step.selector and step.selector.lower() == 'title':
                 # Use page.toHaveTitle() for title assertions
                 if step.value:
-                    escaped_value = step.value.replace("'", "\\'")
+                    escaped_value = _esc(step.value)
                     # Use regex pattern for flexible matching
                     action_code = f"    await expect(page).toHaveTitle(/{escaped_value}/);"
                 else:
                     action_code = "    // SKIPPED: Title assertion requires a value"
             else:
-                # Format selector - use _generate_selector for :visible + .first() support
-                if step.selector:
-                    escaped_selector = step.selector.replace("'", "\\'")
-                    selector_code = self._generate_selector(escaped_selector, step.selector_strategy)
-                else:
-                    selector_code = "page"
+                selector_code = self._resolve_selector(step)
 
                 # Assertions that don't need values
                 no_value_assertions = [
@@ -107,7 +128,7 @@ class TestCompiler:
 
                 # Handle timeout if provided
                 timeout_option = ""
-                if hasattr(step, 'timeout') and step.timeout:
+                if step.timeout:
                     timeout_option = f"{{ timeout: {step.timeout} }}"
 
                 # Check if this assertion needs a value
@@ -119,7 +140,7 @@ class TestCompiler:
                         action_code = f"    await expect({selector_code}).{assertion}();"
                 elif step.value:
                     # Has a value - use it
-                    escaped_value = step.value.replace("'", "\\'")
+                    escaped_value = _esc(step.value)
                     value_str = f"'{escaped_value}'"
                     if timeout_option:
                         action_code = f"    await expect({selector_code}).{assertion}({value_str}, {timeout_option});"
@@ -129,21 +150,22 @@ class TestCompiler:
                     # Assertion requires value but none provided - skip or use default
                     action_code = f"    // SKIPPED: {assertion} requires a value but none was provided"
         else:
-            # Regular actions with selectors - escape quotes
-            if step.selector:
-                escaped_selector = step.selector.replace("'", "\\'")
-                selector_code = self._generate_selector(escaped_selector, step.selector_strategy)
-            else:
-                selector_code = "page"
-
+            # Regular actions with selectors
             action_code = action_template.format(
-                selector=selector_code,
+                selector=self._resolve_selector(step),
                 value=step.value or "",
                 description=step.description,
             )
 
         return f"    // Step {step_number}: {step.description or step.action}\n{action_code}"
 
+    def _resolve_selector(self, step: TestStep) -> str:
+        """Return locator code for a step's selector, or "page" if it has none."""
+        if not step.selector:
+            return "page"
+        # Use _generate_selector for .first() support on ambiguous strategies
+        return self._generate_selector(_esc(step.selector), step.selector_strategy)
+
     def _generate_selector(self, selector: str, strategy: SelectorStrategy) -> str:
         """Generate Playwright selector code based on strategy."""
         # Detect and convert legacy/invalid selector formats
@@ -153,29 +175,15 @@ class TestCompiler:
             # Try to infer strategy from selector format
             strategy = self._infer_selector_strategy(selector)
 
-        template = SELECTOR_TEMPLATES.get(strategy)
-        if not template:
-            # Default to CSS selector with .first()
-            return f"page.locator('{selector}').first()"
-
-        # Generate base selector
-        base_selector = template.format(selector=selector)
-
-        # Add .first() for potentially ambiguous selectors
-        # Don't add for getByTestId (should be unique) or xpath with specific paths
-        if strategy in [SelectorStrategy.TEXT, SelectorStrategy.CSS]:
-            # These strategies often match multiple elements
-            return f"{base_selector}.first()"
-
-        return base_selector
+        # Unknown strategies default to a CSS locator with .first()
+        builder = SELECTOR_BUILDERS.get(strategy, SELECTOR_BUILDERS[SelectorStrategy.CSS])
+        return builder(selector)
 
     def _normalize_selector(self, selector: str) -> str:
         """Normalize legacy or invalid selector formats to valid Playwright syntax."""
-        import re
-
         # Convert a:text('...') to proper getByRole format
         # Pattern: a:text('...') or a:text("...")
-        text_link_match = re.match(r"a:text\(['\"](.+?)['\"]\)", selector)
+        text_link_match = _TEXT_LINK_RE.match(selector)
         if text_link_match:
             # Return the text content - will be used with getByRole later
             return text_link_match.group(1)
@@ -188,21 +196,25 @@ class TestCompiler:
 
     def _infer_selector_strategy(self, selector: str) -> SelectorStrategy:
         """Infer the best selector strategy based on selector format."""
-        import re
-
-        # Check for common patterns
-        if selector.startswith('[data-testid'):
-            return SelectorStrategy.TEST_ID
-        elif selector.startswith('[aria-label'):
-            return SelectorStrategy.ARIA_LABEL
-        elif selector.startswith('//'):
-            return SelectorStrategy.XPATH
-        elif re.match(r'^[a-zA-Z\s]+$', selector) and not selector.startswith('.') and not selector.startswith('#'):
+        # Fast path: most crawled selectors are decided by their first character
+        c = selector[:1]
+        if c == '#' or c == '.':
+            return SelectorStrategy.CSS
+        if c == '/':
+            return SelectorStrategy.XPATH if selector.startswith('//') else SelectorStrategy.CSS
+        if c == '[':
+            if selector.startswith('[data-testid'):
+                return SelectorStrategy.TEST_ID
+            if selector.startswith('[aria-label'):
+                return SelectorStrategy.ARIA_LABEL
+            return SelectorStrategy.CSS
+
+        if _PLAIN_TEXT_RE.match(selector):
             # Plain text without CSS indicators
             return SelectorStrategy.TEXT
-        else:
-            # Default to CSS
-            return SelectorStrategy.CSS
+
+        # Default to CSS
+        return SelectorStrategy.CSS
 
     def _save_spec_file(self, suite_id: str, content: str) -> Path:
         """Save the compiled spec to a file."""
@@ -212,4 +224,9 @@ class TestCompiler:
         output_path = output_dir / f"{suite_id}.spec.ts"
         output_path.write_text(content)
 
-        return output_path
\ No newline at end of file
+        return output_path
+
+
+def _compile_one(test_suite: TestSuite) -> Path:
+    """Compile a single suite in a worker process (must be module-level to pickle)."""
+    return TestCompiler().compile(test_suite)
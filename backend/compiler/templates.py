@@ -2,16 +2,19 @@
 
 from backend.shared.types import ActionType, SelectorStrategy
 
-# Main test file template
-TEST_FILE_TEMPLATE = """import {{ test, expect }} from '@playwright/test';
+# Main test file template, split around the test cases so only the
+# small header needs formatting
+TEST_FILE_HEAD_TEMPLATE = """import {{ test, expect }} from '@playwright/test';
 
 test.describe('Generated E2E Tests', () => {{
   test.beforeEach(async ({{ page }}) => {{
     await page.goto('{base_url}');
   }});
 
-{test_cases}
-}});
+"""
+
+TEST_FILE_TAIL = """
+});
 """
 
 # Individual test case template
@@ -23,13 +26,15 @@ TEST_CASE_TEMPLATE = """  test('{test_name}', async ({{ page }}) => {{
 {assertions}
   }});"""
 
-# Selector generation templates
-SELECTOR_TEMPLATES = {
-    SelectorStrategy.TEST_ID: "page.getByTestId('{selector}')",
-    SelectorStrategy.ARIA_LABEL: "page.getByLabel('{selector}')",
-    SelectorStrategy.TEXT: "page.getByText('{selector}')",
-    SelectorStrategy.CSS: "page.locator('{selector}')",
-    SelectorStrategy.XPATH: "page.locator('{selector}')",
+# Selector builders - each returns the finished locator code.
+# TEXT and CSS often match multiple elements, so they get .first();
+# getByTestId should be unique and xpath paths are specific.
+SELECTOR_BUILDERS = {
+    SelectorStrategy.TEST_ID: lambda s: f"page.getByTestId('{s}')",
+    SelectorStrategy.ARIA_LABEL: lambda s: f"page.getByLabel('{s}')",
+    SelectorStrategy.TEXT: lambda s: f"page.getByText('{s}').first()",
+    SelectorStrategy.CSS: lambda s: f"page.locator('{s}').first()",
+    SelectorStrategy.XPATH: lambda s: f"page.locator('{s}')",
 }
 
 # Action templates
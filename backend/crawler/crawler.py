@@ -1,16 +1,81 @@
 """Main crawler implementation using Playwright BFS with Neo4j integration."""
 
 import asyncio
+import itertools
+import logging
+import re
+import uuid
 from pathlib import Path
-from typing import Set, List, Optional, Dict, Any
-from urllib.parse import urlparse
-from playwright.async_api import async_playwright, Page, Browser
-from backend.shared.types import PageElement, PageAction
+from typing import Set, List, Optional, Dict, Any, Tuple
+from urllib.parse import urljoin, urlparse
+from urllib.robotparser import RobotFileParser
+import httpx
+from playwright.async_api import async_playwright, Page, Browser, Route, TimeoutError as PlaywrightTimeoutError
 from backend.shared.config import get_config
 from backend.shared.graph_db import GraphDB
-from backend.shared.utils import get_timestamp, sanitize_filename
+from backend.shared.utils import canonicalize_url, get_timestamp, sanitize_filename
 from .page_analyzer import PageAnalyzer
 
+logger = logging.getLogger(__name__)
+
+# Element type -> possible actions; inputs and textareas are keyed by their type attribute
+ELEMENT_ACTIONS: Dict[str, Tuple[str, ...]] = {
+    "button": ("click",),
+    "input[type='button']": ("click",),
+    "input[type='submit']": ("click",),
+    "link": ("click",),
+    "select": ("select",),
+}
+INPUT_ACTIONS: Dict[str, str] = {
+    **dict.fromkeys(("text", "email", "password", "search", "tel", "url"), "fill"),
+    **dict.fromkeys(("checkbox", "radio"), "check"),
+}
+
+# Trim Chromium background work that a headless crawl never needs
+CHROMIUM_CRAWL_ARGS = [
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-sync",
+]
+# Skips images in the renderer rather than through a request route, which would disable the
+# HTTP cache for the whole context. Only used when "image" is blocked and screenshots are off.
+CHROMIUM_NO_IMAGES_ARG = "--blink-settings=imagesEnabled=false"
+
+PROGRESS_QUEUE_SIZE = 1000
+JPEG_SCREENSHOT_QUALITY = 60
+
+ROBOTS_USER_AGENT = "QAsmith"
+CANONICAL_PREFETCH_BYTES = 64 * 1024
+_CANONICAL_TAG_RE = re.compile(rb"<link\b[^>]*\brel=[\"']?canonical\b[^>]*>", re.IGNORECASE)
+_HREF_ATTR_RE = re.compile(rb"\bhref=[\"']?([^\"'\s>]+)", re.IGNORECASE)
+
+# Single in-page pass collecting everything the crawler needs from a page's DOM. It is
+# installed once per context as an init script, so each page only evaluates a short call.
+PAGE_GRAPH_INIT_JS = """
+window.__qasmithPageGraph = (base) => {
+    const seen = new Set();
+    const links = [];
+    const buttons = [];
+    for (const el of document.querySelectorAll('a[href], button, input[type="button"], input[type="submit"]')) {
+        if (el.tagName === 'A') {
+            // Only same-site links are crawled or linked, so don't ship the rest back;
+            // the http(s) base prefix also rules out javascript:, mailto: and similar schemes
+            if (el.href.startsWith(base) && !seen.has(el.href)) {
+                seen.add(el.href);
+                links.push({url: el.href, text: el.textContent?.trim() || ''});
+            }
+        } else if (buttons.length < 50) {
+            buttons.push({text: el.textContent?.trim() || el.value || '', type: 'button'});
+        }
+    }
+    const canonical = document.querySelector('link[rel="canonical"]')?.href || null;
+    return {title: document.title, links, buttons, canonical};
+};
+"""
+PAGE_GRAPH_JS = "base => window.__qasmithPageGraph(base)"
+
 
 class Crawler:
     """BFS web crawler using Playwright with Neo4j graph storage."""
@@ -19,302 +84,494 @@ class Crawler:
         self.config = get_config()
         self.graph_db = graph_db
         self.visited_urls: Set[str] = set()
+        self.page_id_map: Dict[str, str] = {}
+        self.canonical_page_ids: Dict[str, str] = {}  # Page identity (declared canonical, else own URL) -> page_id
+        self.edges_by_url: Dict[str, List[Dict[str, str]]] = {}  # URL -> links found on that page
         self.analyzer = PageAnalyzer()
         self.crawl_id: Optional[str] = None
         self.embedding_generator = embedding_generator
         self.progress_callback = None  # For WebSocket progress updates
+        self.priority_rules: List[Tuple[re.Pattern, int]] = [
+            (re.compile(pattern), priority)
+            for pattern, priority in self.config.crawler.priority_rules.items()
+        ]
 
     async def crawl(self, base_url: str) -> str:
         """Perform BFS crawl of the website and store in Neo4j graph."""
-        print(f"🕷️  CRAWLER: Starting crawl for {base_url}")
-        base_url = base_url.rstrip("/")
+        logger.info("🕷️  CRAWLER: Starting crawl for %s", base_url)
+        base_url = canonicalize_url(base_url)
+        self._base_url = base_url
         parsed_url = urlparse(base_url)
         domain = parsed_url.netloc
         
-        print(f"🔗 CRAWLER: Parsed domain: {domain}")
+        logger.info("🔗 CRAWLER: Parsed domain: %s", domain)
         
         try:
             # Create crawl in Neo4j
-            print("📊 CRAWLER: Creating crawl record in Neo4j...")
-            self.crawl_id = self.graph_db.create_crawl(base_url, domain)
-            print(f"✅ CRAWLER: Created crawl {self.crawl_id} for {base_url}")
+            logger.info("📊 CRAWLER: Creating crawl record in Neo4j...")
+            self.crawl_id = await asyncio.to_thread(self.graph_db.create_crawl, base_url, domain)
+            logger.info("✅ CRAWLER: Created crawl %s for %s", self.crawl_id, base_url)
         except Exception as e:
-            print(f"❌ CRAWLER: Failed to create crawl in Neo4j: {e}")
+            logger.error("❌ CRAWLER: Failed to create crawl in Neo4j: %s", e)
             raise
         
         try:
-            print("🌐 CRAWLER: Launching Playwright browser...")
+            logger.info("🌐 CRAWLER: Launching Playwright browser...")
             async with async_playwright() as p:
-                # Use Firefox for better macOS compatibility
-                browser = await p.firefox.launch(headless=True)
-                print("✅ CRAWLER: Browser launched successfully")
+                engine = self.config.crawler.browser
+                # Firefox remains available (e.g. for macOS compatibility) but takes no extra flags
+                launch_args = list(CHROMIUM_CRAWL_ARGS) if engine == "chromium" else []
+                # Resource types the workers' request route aborts
+                blocked_types = set(self.config.crawler.blocked_resource_types)
+                if engine == "chromium" and "image" in blocked_types and not self.config.crawler.screenshot:
+                    launch_args.append(CHROMIUM_NO_IMAGES_ARG)
+                    blocked_types.discard("image")
+                self._blocked_types = frozenset(blocked_types)
+                browser = await getattr(p, engine).launch(headless=True, args=launch_args)
+                logger.info("✅ CRAWLER: Browser launched successfully (%s)", engine)
                 
-                page = await browser.new_page(
-                    viewport={
-                        "width": self.config.crawler.viewport["width"],
-                        "height": self.config.crawler.viewport["height"],
-                    }
-                )
-                print(f"📄 CRAWLER: Created new page with viewport {self.config.crawler.viewport}")
-
-                queue = [base_url]
-                page_id_map = {}  # URL -> page_id mapping for linking
-
-                print(f"🎯 CRAWLER: Starting BFS crawl (max_depth: {self.config.crawler.max_depth}, max_pages: {self.config.crawler.max_pages})")
-
-                while queue and len(self.visited_urls) < self.config.crawler.max_pages:
-                    current_url = queue.pop(0)
-
-                    # Calculate depth based on URL path segments (not BFS order)
-                    current_depth = self._calculate_url_depth(current_url, base_url)
-
-                    if current_url in self.visited_urls or current_depth > self.config.crawler.max_depth:
-                        print(f"⏭️  CRAWLER: Skipping {current_url} (visited: {current_url in self.visited_urls}, depth: {current_depth})")
-                        continue
-
-                    print(f"🔍 CRAWLER: Crawling {current_url} (depth: {current_depth}, queue: {len(queue)}, visited: {len(self.visited_urls)})")
-
+                # Min-priority frontier of (priority, depth, seq, url); seq keeps FIFO order within a priority
+                self._frontier = asyncio.PriorityQueue()
+                self._seq = itertools.count()
+                self._queued = set()  # Everything ever enqueued, for O(1) dedup
+                self._in_flight = 0
+                self.page_id_map = {}  # URL -> page_id mapping for linking
+                self.canonical_page_ids = {}
+                self.edges_by_url = {}
+                self._screenshot_writes: Set[asyncio.Task] = set()
+                # Created once per crawl rather than on every screenshot
+                self._screenshots_dir = Path(self.config.storage.artifacts_path) / "screenshots" / self.crawl_id
+                if self.config.crawler.screenshot:
+                    self._screenshots_dir.mkdir(parents=True, exist_ok=True)
+
+                concurrency = max(1, self.config.crawler.concurrency)
+                logger.info("🎯 CRAWLER: Starting BFS crawl (max_depth: %s, max_pages: %s, workers: %s)", self.config.crawler.max_depth, self.config.crawler.max_pages, concurrency)
+
+                # Page and element writes are flushed to Neo4j in the background, off the crawl path
+                self._db_queue = asyncio.Queue()
+                db_writer = asyncio.create_task(self._flush_db_loop())
+                # Progress updates are delivered by a drainer task so a slow client can't stall workers
+                self._progress_q = asyncio.Queue(maxsize=PROGRESS_QUEUE_SIZE)
+                progress_sender = asyncio.create_task(self._drain_progress())
+
+                # Plain HTTP client for robots.txt and canonical prechecks, shared by all workers
+                async with httpx.AsyncClient(
+                    follow_redirects=True,
+                    timeout=self.config.crawler.timeout / 1000,
+                    limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+                ) as http:
+                    self._http = http
+                    self._robots = None
+                    if self.config.crawler.respect_robots_txt:
+                        self._robots = await self._load_robots(base_url)
+                    self._enqueue(base_url, 0)
+
+                    workers = [
+                        asyncio.create_task(self._worker(browser, base_url))
+                        for _ in range(concurrency)
+                    ]
+                    # Every queued URL is marked done by a worker, so join() returns once the frontier drains
+                    drained = asyncio.create_task(self._frontier.join())
                     try:
-                        page_id = await self._crawl_page(page, current_url, current_depth)
-                        page_id_map[current_url] = page_id
-                        self.visited_urls.add(current_url)
-                        print(f"✅ CRAWLER: Successfully crawled {current_url} -> page_id: {page_id}")
-
-                        # Extract links for BFS crawling
-                        if current_depth < self.config.crawler.max_depth:
-                            print(f"🔗 CRAWLER: Extracting links from {current_url}...")
-                            links = await self._extract_links(page, base_url)
-                            print(f"🔗 CRAWLER: Found {len(links)} internal links")
-
-                            for link in links:
-                                # Add to crawl queue if not visited
-                                if link not in self.visited_urls and link not in queue:
-                                    link_depth = self._calculate_url_depth(link, base_url)
-                                    if link_depth <= self.config.crawler.max_depth:
-                                        queue.append(link)
-                                        print(f"➕ CRAWLER: Added to queue: {link} (depth: {link_depth})")
-                        
-                        # Add configurable delay between pages (to be respectful to servers)
-                        page_delay_ms = getattr(self.config.crawler, 'page_delay_ms', 0)
-                        if page_delay_ms > 0:
-                            delay_sec = page_delay_ms / 1000
-                            print(f"⏱️ CRAWLER: Waiting {delay_sec}s before next page...")
-                            await asyncio.sleep(delay_sec)
-
-                    except Exception as e:
-                        print(f"❌ CRAWLER: Error crawling {current_url}: {e}")
-                        import traceback
-                        print(f"🔍 CRAWLER: Traceback: {traceback.format_exc()}")
-                        continue
+                        # Workers only finish early if they fail (e.g. the browser context can't be
+                        # created); wait on them too so the crawl fails instead of hanging on join()
+                        done, _ = await asyncio.wait([drained, *workers], return_when=asyncio.FIRST_COMPLETED)
+                        if drained not in done:
+                            failed = done.pop()
+                            raise failed.exception() or RuntimeError("Crawler worker exited unexpectedly")
+                    finally:
+                        drained.cancel()
+                        for worker in workers:
+                            worker.cancel()
+                        await asyncio.gather(*workers, return_exceptions=True)
+                        self._db_queue.put_nowait(None)
+                        await db_writer
+                        await self._progress_q.put(None)
+                        await progress_sender
+                        await asyncio.gather(*self._screenshot_writes, return_exceptions=True)
 
                 # Create hierarchical parent-child relationships based on URL structure
-                print(f"🔗 CRAWLER: Creating hierarchical parent-child relationships...")
-                self._create_hierarchical_links(page_id_map, base_url)
-                print(f"✅ CRAWLER: Hierarchical relationships created")
+                logger.info("🔗 CRAWLER: Creating hierarchical parent-child relationships...")
+                await asyncio.to_thread(self._create_hierarchical_links, self.page_id_map, base_url)
+                logger.info("✅ CRAWLER: Hierarchical relationships created")
+
+                # Create navigation links from the anchors seen on each page (no re-navigation)
+                await asyncio.to_thread(self._create_page_links, self.page_id_map, base_url)
+                logger.info("✅ CRAWLER: Navigation links created")
 
                 await browser.close()
-                print("🔒 CRAWLER: Browser closed")
+                logger.info("🔒 CRAWLER: Browser closed")
 
         except Exception as e:
-            print(f"❌ CRAWLER: Critical error during crawl: {e}")
-            import traceback
-            print(f"🔍 CRAWLER: Full traceback: {traceback.format_exc()}")
+            logger.exception("❌ CRAWLER: Critical error during crawl: %s", e)
             raise
 
         # Mark crawl as complete
         try:
-            print("📊 CRAWLER: Marking crawl as complete in Neo4j...")
-            self.graph_db.mark_crawl_complete(self.crawl_id)
-            print(f"🎉 CRAWLER: Crawl {self.crawl_id} completed successfully with {len(self.visited_urls)} pages")
+            logger.info("📊 CRAWLER: Marking crawl as complete in Neo4j...")
+            await asyncio.to_thread(self.graph_db.mark_crawl_complete, self.crawl_id)
+            logger.info("🎉 CRAWLER: Crawl %s completed successfully with %s pages", self.crawl_id, len(self.visited_urls))
         except Exception as e:
-            print(f"❌ CRAWLER: Failed to mark crawl as complete: {e}")
+            logger.error("❌ CRAWLER: Failed to mark crawl as complete: %s", e)
             raise
         
         return self.crawl_id
 
-    async def _crawl_page(self, page: Page, url: str, depth: int) -> str:
-        """Crawl a single page and store in Neo4j graph."""
-        print(f"📄 PAGE: Loading {url}...")
+    def _report_progress(self, update: Dict[str, Any]):
+        """Queue a progress update for the callback without waiting on it."""
+        if not self.progress_callback:
+            return
+        # page_loading updates are informational; keep half the queue free for the ones that matter
+        if update["type"] == "page_loading" and self._progress_q.qsize() >= PROGRESS_QUEUE_SIZE // 2:
+            return
+        if self._progress_q.full():
+            self._progress_q.get_nowait()  # Drop the oldest update rather than block the crawl
+        self._progress_q.put_nowait(update)
+
+    async def _drain_progress(self):
+        """Send queued progress updates to the callback until a None sentinel arrives."""
+        while True:
+            update = await self._progress_q.get()
+            if update is None:
+                return
+            try:
+                await self.progress_callback(update)
+            except Exception as e:
+                logger.debug("Progress callback failed: %s", e)
+
+    async def _flush_db_loop(self):
+        """Drain queued page writes into Neo4j until a None sentinel arrives."""
+        while True:
+            batch = [await self._db_queue.get()]
+            while not self._db_queue.empty():
+                batch.append(self._db_queue.get_nowait())
+
+            done = None in batch
+            batch = [item for item in batch if item is not None]
+            if batch:
+                await asyncio.to_thread(self._write_page_batches, batch)
+            if done:
+                return
+
+    def _write_page_batches(self, batch: List[Tuple[Dict[str, Any], List[Dict[str, Any]]]]):
+        """Write several pages and their element rows (runs in a worker thread)."""
+        for page_record, rows in batch:
+            try:
+                self.graph_db.add_page(**page_record)
+                self.graph_db.add_elements_bulk(page_record["page_id"], rows)
+            except Exception as e:
+                logger.error("❌ CRAWLER: Failed to write page %s: %s", page_record["url"], e)
+
+    def _enqueue(self, url: str, depth: int):
+        """Add a URL to the crawl frontier unless it was already queued."""
+        if url in self._queued:
+            return
+        self._queued.add(url)
+        priority = self._url_priority(url, depth)
+        self._frontier.put_nowait((priority, depth, next(self._seq), url))
+
+    async def _worker(self, browser: Browser, base_url: str):
+        """Consume URLs from the frontier using a browser context owned by this worker."""
+        crawler_config = self.config.crawler
+        max_pages = crawler_config.max_pages
+        max_depth = crawler_config.max_depth
+        viewport = {
+            "width": crawler_config.viewport["width"],
+            "height": crawler_config.viewport["height"],
+        }
+        delay_sec = crawler_config.page_delay_ms / 1000
+        precheck_canonical = crawler_config.precheck_canonical
+        blocked_types = self._blocked_types
+
+        async def route_request(route: Route):
+            # Images, fonts and media play no part in link or element extraction
+            if route.request.resource_type in blocked_types:
+                await route.abort()
+            else:
+                await route.continue_()
+
+        # One long-lived context per worker; each URL gets a throwaway page in it
+        context = await browser.new_context(viewport=viewport)
+        await context.add_init_script(PAGE_GRAPH_INIT_JS)
+        if blocked_types:
+            await context.route("**/*", route_request)
+        try:
+            while True:
+                _, depth, _, url = await self._frontier.get()
+                try:
+                    if url in self.visited_urls:
+                        continue
+                    if len(self.visited_urls) + self._in_flight >= max_pages:
+                        logger.debug("⏭️  CRAWLER: Skipping %s (max_pages reached)", url)
+                        continue
+                    # Take the max_pages slot before any await so concurrent workers can't all pass the check
+                    self._in_flight += 1
+                    holds_slot = True
+                    try:
+                        if self._robots and not self._robots.can_fetch(ROBOTS_USER_AGENT, url):
+                            if depth == 0:
+                                # Staging sites often disallow everything; say why the crawl ends up empty
+                                logger.warning("⚠️ CRAWLER: robots.txt disallows the start URL %s; set crawler.respect_robots_txt to false to crawl it", url)
+                                self._report_progress({
+                                    "type": "page_error",
+                                    "url": url,
+                                    "error": "Disallowed by robots.txt (crawler.respect_robots_txt is enabled)",
+                                })
+                            else:
+                                logger.debug("⏭️  CRAWLER: Skipping %s (disallowed by robots.txt)", url)
+                            continue
+                        if precheck_canonical:
+                            canonical_url = await self._prefetch_canonical(url)
+                            if canonical_url and canonical_url != url and self._canonical_page_id(canonical_url):
+                                logger.debug("⏭️  CRAWLER: Skipping %s (duplicate of %s)", url, canonical_url)
+                                continue
+
+                        logger.debug("🔍 CRAWLER: Crawling %s (depth: %s, queue: %s, visited: %s)", url, depth, self._frontier.qsize(), len(self.visited_urls))
+
+                        page = await context.new_page()
+                        try:
+                            page_id = await self._crawl_page(page, url, depth)
+                            if page_id is None:
+                                # Duplicate of an already stored page; aliases stay out of page_id_map
+                                # so hierarchy and link edges are only built between real pages
+                                continue
+                            self.page_id_map[url] = page_id
+                            self.visited_urls.add(url)
+                            # The page now counts through visited_urls; hand the slot back so
+                            # page cleanup doesn't hold it twice
+                            self._in_flight -= 1
+                            holds_slot = False
+                            logger.info("✅ CRAWLER: Successfully crawled %s -> page_id: %s", url, page_id)
+
+                            # Extract links for BFS crawling, unless this page and the ones still
+                            # in flight already fill max_pages and nothing queued now could be crawled
+                            if depth < max_depth and len(self.visited_urls) + self._in_flight < max_pages:
+                                logger.debug("🔗 CRAWLER: Extracting links from %s...", url)
+                                links = self._extract_links(self.edges_by_url.get(url, []), base_url)
+                                logger.debug("🔗 CRAWLER: Found %s internal links", len(links))
+
+                                # Links come back unvisited with their depth; _enqueue drops ones already queued
+                                for link, link_depth in links:
+                                    if link_depth <= max_depth:
+                                        self._enqueue(link, link_depth)
+                                        logger.debug("➕ CRAWLER: Added to queue: %s (depth: %s)", link, link_depth)
+                        finally:
+                            # Close the page plus any popups it opened so the context doesn't accumulate tabs
+                            for open_page in context.pages:
+                                await open_page.close()
+                            # Reset cookies so pages don't share session state; the warm connection pool is kept
+                            await context.clear_cookies()
+                    finally:
+                        # Release the max_pages slot on every other path, including skips and failed cleanups
+                        if holds_slot:
+                            self._in_flight -= 1
+
+                    # Add configurable delay between pages (to be respectful to servers)
+                    if delay_sec > 0:
+                        logger.debug("⏱️ CRAWLER: Waiting %ss before next page...", delay_sec)
+                        await asyncio.sleep(delay_sec)
+
+                except Exception as e:
+                    logger.exception("❌ CRAWLER: Error crawling %s: %s", url, e)
+                finally:
+                    self._frontier.task_done()
+        finally:
+            await context.close()
+
+    async def _crawl_page(self, page: Page, url: str, depth: int) -> Optional[str]:
+        """Crawl a single page and store in Neo4j graph.
+
+        Returns the new page's ID, or None when the page declares a canonical URL
+        that an already crawled page was stored under.
+        """
+        crawler_config = self.config.crawler
+        skip_embeddings = crawler_config.skip_embeddings
+
+        logger.debug("📄 PAGE: Loading %s...", url)
         
         # Send progress update
-        if self.progress_callback:
-            await self.progress_callback({
-                "type": "page_loading",
-                "url": url,
-                "depth": depth,
-                "visited": len(self.visited_urls)
-            })
+        self._report_progress({
+            "type": "page_loading",
+            "url": url,
+            "depth": depth,
+            "visited": len(self.visited_urls)
+        })
         
         try:
-            await page.goto(url, timeout=self.config.crawler.timeout, wait_until="domcontentloaded")
-            print(f"✅ PAGE: Successfully loaded {url}")
+            try:
+                await page.goto(url, timeout=crawler_config.timeout, wait_until="domcontentloaded")
+                logger.debug("✅ PAGE: Successfully loaded %s", url)
+            except PlaywrightTimeoutError:
+                # A response that committed but never finished loading still has a usable DOM
+                if page.url == "about:blank":
+                    raise
+                logger.warning("⚠️ PAGE: Timed out loading %s; extracting from the partial DOM", url)
         except Exception as e:
-            print(f"❌ PAGE: Failed to load {url}: {e}")
-            if self.progress_callback:
-                await self.progress_callback({
-                    "type": "page_error",
-                    "url": url,
-                    "error": str(e)
-                })
+            logger.error("❌ PAGE: Failed to load %s: %s", url, e)
+            self._report_progress({
+                "type": "page_error",
+                "url": url,
+                "error": str(e)
+            })
             raise
 
-        # Get page title
-        try:
-            title = await page.title()
-            print(f"📝 PAGE: Title: '{title}'")
-        except Exception as e:
-            print(f"❌ PAGE: Failed to get title: {e}")
-            title = "Unknown Title"
+        # Capture title, same-site links and buttons in one evaluation; links feed
+        # element sampling, LINKS_TO edges and BFS discovery
+        page_graph = await self._extract_page_graph(page, self._base_url)
+        title = page_graph["title"]
+        logger.debug("📝 PAGE: Title: '%s'", title)
+        raw_links = page_graph["links"]
+
+        # A page is recorded once per identity: its declared canonical URL, else its own URL
+        identity = canonicalize_url(page_graph["canonical"]) if page_graph["canonical"] else url
+        if identity != url:
+            self._queued.add(identity)
+        if identity in self.canonical_page_ids:
+            logger.debug("⏭️  PAGE: %s is a duplicate of %s", url, identity)
+            return None
+        # Claim the identity before any await so a concurrent alias can't store the same page;
+        # the ID is generated here so elements and links can reference the page before it reaches Neo4j
+        page_id = str(uuid.uuid4())
+        self.canonical_page_ids[identity] = page_id
+
+        self.edges_by_url[url] = raw_links
 
         # Extract comprehensive page content (SKIP IF DISABLED FOR SPEED)
         content_data = None
         embedding = None
 
-        skip_embeddings = getattr(self.config.crawler, 'skip_embeddings', True)  # Default to True (skip for speed)
-        print(f"🔍 PAGE: skip_embeddings setting = {skip_embeddings}")
+        logger.debug("🔍 PAGE: skip_embeddings setting = %s", skip_embeddings)
+
+        # Process a reasonable number of elements (for performance)
+        max_elements = 30  # Limit for performance
+        element_rows_task = None
 
         if not skip_embeddings:
+            # Start the element snapshot now so its round trip overlaps content extraction
+            element_rows_task = asyncio.create_task(
+                self.analyzer.extract_element_rows(page, max_per_type=max_elements)
+            )
             try:
-                print(f"📊 PAGE: Extracting page content...")
+                logger.debug("📊 PAGE: Extracting page content...")
                 content_data = await self.analyzer.extract_page_content(page)
-                print(f"✅ PAGE: Extracted content ({content_data.get('content_length', 0)} chars)")
+                logger.debug("✅ PAGE: Extracted content (%s chars)", content_data.get('content_length', 0))
                 
                 # Generate embedding if generator is available
                 if self.embedding_generator and content_data.get("embedding_text"):
-                    print(f"🧠 PAGE: Generating AI embedding...")
+                    logger.debug("🧠 PAGE: Generating AI embedding...")
                     embedding = self.embedding_generator.generate_embedding(content_data["embedding_text"])
-                    print(f"✅ PAGE: Generated embedding with {len(embedding)} dimensions")
+                    logger.debug("✅ PAGE: Generated embedding with %s dimensions", len(embedding))
             except Exception as e:
-                print(f"❌ PAGE: Failed to extract content: {e}")
+                logger.error("❌ PAGE: Failed to extract content: %s", e)
         else:
-            print(f"⏩ PAGE: Skipping embeddings for speed")
+            logger.debug("⏩ PAGE: Skipping embeddings for speed")
 
         # Take screenshot (viewport only for speed - not full page)
         screenshot_path = None
-        if self.config.crawler.screenshot:
+        if crawler_config.screenshot:
             try:
                 screenshot_path = self._get_screenshot_path(url)
-                await page.screenshot(path=screenshot_path, full_page=False)  # Changed to False for speed
-                print(f"📸 PAGE: Screenshot saved to {screenshot_path}")
+                if crawler_config.screenshot_type == "jpeg":
+                    image = await page.screenshot(full_page=False, type="jpeg", quality=JPEG_SCREENSHOT_QUALITY)
+                else:
+                    image = await page.screenshot(full_page=False)  # Changed to False for speed
+                # Write the PNG in the background so the next page can start right away
+                write = asyncio.create_task(asyncio.to_thread(self._write_screenshot, screenshot_path, image))
+                self._screenshot_writes.add(write)
+                write.add_done_callback(self._screenshot_writes.discard)
             except Exception as e:
-                print(f"❌ PAGE: Failed to take screenshot: {e}")
-
-        # Add page to Neo4j with rich content
-        try:
-            print(f"📊 PAGE: Adding page to Neo4j...")
-            page_id = self.graph_db.add_page(
-                crawl_id=self.crawl_id,
-                url=url,
-                title=title,
-                depth=depth,
-                screenshot_path=str(screenshot_path) if screenshot_path else None,
-                content_data=content_data,
-                embedding=embedding
-            )
-            print(f"✅ PAGE: Added to Neo4j with page_id: {page_id}")
-            
-            # Send progress update
-            if self.progress_callback:
-                await self.progress_callback({
-                    "type": "page_complete",
-                    "url": url,
-                    "page_id": page_id,
-                    "title": title,
-                    "depth": depth,
-                    "content_length": content_data.get("content_length", 0) if content_data else 0
-                })
-        except Exception as e:
-            print(f"❌ PAGE: Failed to add page to Neo4j: {e}")
-            raise
+                logger.error("❌ PAGE: Failed to take screenshot: %s", e)
+
+        # Queue the page for the background writer
+        page_record = {
+            "page_id": page_id,
+            "crawl_id": self.crawl_id,
+            "url": url,
+            "title": title,
+            "depth": depth,
+            "screenshot_path": str(screenshot_path) if screenshot_path else None,
+            "content_data": content_data,
+            "embedding": embedding,
+        }
 
+        # Send progress update
+        self._report_progress({
+            "type": "page_complete",
+            "url": url,
+            "page_id": page_id,
+            "title": title,
+            "depth": depth,
+            "content_length": content_data.get("content_length", 0) if content_data else 0
+        })
+
+        rows = []
         # Analyze page elements and add to graph (SIMPLIFIED FOR SPEED)
         try:
             # Check if we should do full element extraction or simplified version
-            skip_detailed_elements = getattr(self.config.crawler, 'skip_embeddings', True)  # Default to True (skip for speed)
-            
-            if skip_detailed_elements:
+            if skip_embeddings:
                 # FAST MODE: Just extract links and basic elements in bulk
-                print(f"⚡ PAGE: Fast element extraction mode...")
+                logger.debug("⚡ PAGE: Fast element extraction mode...")
                 
-                # Extract links directly from page
-                links = await page.evaluate("""
-                    () => Array.from(document.querySelectorAll('a[href]'))
-                        .map(a => ({
-                            url: a.href,
-                            text: a.textContent?.trim() || '',
-                            type: 'link'
-                        }))
-                        .filter(link => link.url && !link.url.startsWith('javascript:'))
-                        .slice(0, 100)
-                """)
+                # Reuse the links captured above
+                links = raw_links[:100]
                 
-                # Extract basic interactive elements
-                buttons = await page.evaluate("""
-                    () => Array.from(document.querySelectorAll('button, input[type="button"], input[type="submit"]'))
-                        .map(el => ({
-                            text: el.textContent?.trim() || el.value || '',
-                            type: 'button'
-                        }))
-                        .slice(0, 50)
-                """)
+                # Basic interactive elements from the same evaluation
+                buttons = page_graph["buttons"]
                 
                 # Add all elements in bulk
                 element_count = len(links) + len(buttons)
-                print(f"⚡ PAGE: Found {element_count} elements ({len(links)} links, {len(buttons)} buttons)")
+                logger.debug("⚡ PAGE: Found %s elements (%s links, %s buttons)", element_count, len(links), len(buttons))
                 
                 # Add a sample of elements to Neo4j (just for graph structure)
-                sample_size = min(10, element_count)
-                for i in range(sample_size):
-                    if i < len(links):
-                        element_data = links[i]
-                        try:
-                            self.graph_db.add_element(
-                                page_id=page_id,
-                                selector=element_data.get('text', '')[:30] or element_data.get('url', '')[:30],
-                                selector_strategy="TEXT",
-                                element_type="link",
-                                text=element_data.get('text', '')[:50],
-                                attributes={"href": element_data.get('url', '')}
-                            )
-                        except Exception as e:
-                            print(f"⚠️ PAGE: Skipping element: {e}")
-                
-                print(f"⚡ PAGE: Added {sample_size} sample elements")
+                rows = [
+                    {
+                        "selector": link.get('text', '')[:30] or link.get('url', '')[:30],
+                        "selector_strategy": "TEXT",
+                        "element_type": "link",
+                        "text": link.get('text', '')[:50],
+                        "attributes": {"href": link.get('url', '')},
+                    }
+                    for link in links[:10]
+                ]
+                logger.debug("⚡ PAGE: Prepared %s sample elements", len(rows))
                 
             else:
                 # DETAILED MODE: Full element extraction (slower but more complete)
-                print(f"🔍 PAGE: Analyzing page elements...")
-                elements = await self.analyzer.extract_elements(page)
-                print(f"🔍 PAGE: Found {len(elements)} interactive elements")
+                logger.debug("🔍 PAGE: Analyzing page elements...")
+                # Plain dicts: these only feed the graph write, so skip PageElement validation
+                elements = await element_rows_task
+                logger.debug("🔍 PAGE: Found %s interactive elements", len(elements))
                 
-                # Process a reasonable number of elements (for performance)
-                max_elements = 30  # Limit for performance
-                for i, element in enumerate(elements[:max_elements]):
-                    print(f"🔧 PAGE: Processing element {i+1}/{min(len(elements), max_elements)}: {element.element_type} - {element.selector}")
-                    try:
-                        element_id = self.graph_db.add_element(
-                            page_id=page_id,
-                            selector=element.selector,
-                            selector_strategy=element.selector_strategy.value,
-                            element_type=element.element_type,
-                            text=element.text,
-                            attributes=element.attributes
-                        )
-                        
-                        # Add possible actions for this element
-                        await self._add_element_actions(element, element_id)
-                        
-                    except Exception as e:
-                        print(f"⚠️ PAGE: Skipping element: {e}")
-                        continue
+                rows = [
+                    {
+                        "selector": element["selector"],
+                        "selector_strategy": element["selector_strategy"].value,
+                        "element_type": element["element_type"],
+                        "text": element["text"],
+                        "attributes": element["attributes"],
+                        # Possible actions for this element
+                        "actions": self._element_actions(element["element_type"], element["attributes"]),
+                    }
+                    for element in elements[:max_elements]
+                ]
+                logger.debug("🔧 PAGE: Prepared %s elements with their actions", len(rows))
             
         except Exception as e:
-            print(f"❌ PAGE: Failed to analyze elements: {e}")
+            logger.error("❌ PAGE: Failed to analyze elements: %s", e)
             # Don't raise here, continue with page creation
 
-        print(f"🎉 PAGE: Successfully processed {url}")
+        self._db_queue.put_nowait((page_record, rows))
+        logger.debug("🎉 PAGE: Successfully processed %s", url)
         return page_id
 
+    def _canonical_page_id(self, canonical_url: str) -> Optional[str]:
+        """ID of the page already claimed for a canonical URL, whether crawled directly or via an alias."""
+        return self.canonical_page_ids.get(canonical_url)
+
+    def _url_priority(self, url: str, depth: int) -> int:
+        """Priority of a URL in the frontier: the best matching rule, else its depth."""
+        return min((p for rule, p in self.priority_rules if rule.search(url)), default=depth)
+
     def _create_hierarchical_links(self, page_id_map: dict, base_url: str):
         """Create parent-child links based on URL hierarchy.
 
@@ -326,43 +583,41 @@ class Crawler:
         If a parent URL doesn't exist in the crawl, attach to the nearest ancestor
         that does exist (including the base URL).
         """
-        clean_base = base_url.split("#")[0].split("?")[0].rstrip("/")
+        clean_base = canonicalize_url(base_url)
+        links = []
 
         for child_url, child_page_id in page_id_map.items():
             # Skip the base URL itself (it has no parent)
-            clean_child = child_url.split("#")[0].split("?")[0].rstrip("/")
+            clean_child = canonicalize_url(child_url)
             if clean_child == clean_base:
                 continue
 
-            # Find the parent URL by removing the last path segment
-            path_after_base = clean_child.replace(clean_base, "")
-            segments = [s for s in path_after_base.split("/") if s]
-
-            if not segments:
+            # Every crawled URL starts with the base; skip any without a path of their own
+            if not clean_child[len(clean_base):].strip("/"):
                 continue
 
-            # Try to find the most specific parent first, then work backwards
-            parent_url = None
-            for i in range(len(segments) - 1, 0, -1):
-                potential_parent = clean_base + "/" + "/".join(segments[:i])
-                if potential_parent in page_id_map:
-                    parent_url = potential_parent
+            # Walk up one segment at a time, most specific parent first, until the base is reached
+            parent_url = clean_base
+            candidate = clean_child.rpartition("/")[0]
+            while len(candidate) > len(clean_base):
+                if candidate in page_id_map:
+                    parent_url = candidate
                     break
+                candidate = candidate.rpartition("/")[0]
 
-            # If no intermediate parent exists, link directly to base URL
-            if not parent_url:
-                parent_url = clean_base
-
-            # Create the hierarchical link
+            # Collect the hierarchical link; link text is the last segment of the child URL
             if parent_url in page_id_map:
-                parent_page_id = page_id_map[parent_url]
-                try:
-                    # Extract link text (last segment of child URL)
-                    link_text = segments[-1] if segments else ""
-                    self.graph_db.link_pages(parent_page_id, child_page_id, link_text)
-                    print(f"🔗 HIERARCHICAL LINK: {parent_url} -> {clean_child}")
-                except Exception as e:
-                    print(f"⚠️ CRAWLER: Failed to create hierarchical link {parent_url} -> {clean_child}: {e}")
+                links.append({
+                    "from_page_id": page_id_map[parent_url],
+                    "to_page_id": child_page_id,
+                    "link_text": clean_child.rpartition("/")[2],
+                })
+                logger.debug("🔗 HIERARCHICAL LINK: %s -> %s", parent_url, clean_child)
+
+        try:
+            self.graph_db.link_pages_bulk(links)
+        except Exception as e:
+            logger.warning("⚠️ CRAWLER: Failed to create hierarchical links: %s", e)
 
     def _calculate_url_depth(self, url: str, base_url: str) -> int:
         """Calculate depth based on URL path segments.
@@ -373,8 +628,8 @@ class Crawler:
             github.com/tc960/munch -> depth 2
         """
         # Normalize URLs by removing trailing slashes, fragments, and query params
-        clean_url = url.split("#")[0].split("?")[0].rstrip("/")
-        clean_base = base_url.split("#")[0].split("?")[0].rstrip("/")
+        clean_url = canonicalize_url(url)
+        clean_base = canonicalize_url(base_url)
 
         # If it's the base URL itself, depth is 0
         if clean_url == clean_base:
@@ -384,95 +639,137 @@ class Crawler:
         if not clean_url.startswith(clean_base):
             return 0  # Not a child of base URL
 
-        path = clean_url.replace(clean_base, "")
+        path = clean_url[len(clean_base):]
 
         # Count non-empty path segments
         segments = [s for s in path.split("/") if s]
         return len(segments)
 
-    async def _extract_links(self, page: Page, base_url: str) -> List[str]:
-        """Extract internal links, prioritizing top-level navigation."""
-        links = await page.eval_on_selector_all(
-            "a[href]",
-            """elements => elements.map(el => el.href).filter(href => href)"""
-        )
+    async def _load_robots(self, base_url: str) -> Optional[RobotFileParser]:
+        """Fetch and parse the site's robots.txt; None means everything is allowed."""
+        robots_url = urljoin(base_url + "/", "/robots.txt")
+        try:
+            response = await self._http.get(robots_url)
+        except httpx.HTTPError as e:
+            logger.warning("⚠️ CRAWLER: Could not fetch %s: %s", robots_url, e)
+            return None
+
+        robots = RobotFileParser(robots_url)
+        # Same outcome as RobotFileParser.read(): 401/403 block the site, other 4xx mean there is
+        # no robots.txt, and a server error leaves the rules unknown, so nothing may be fetched
+        if response.status_code in (401, 403):
+            robots.disallow_all = True
+        elif response.status_code >= 500:
+            logger.warning("⚠️ CRAWLER: %s returned %s; treating the site as disallowed", robots_url, response.status_code)
+            robots.disallow_all = True
+        elif response.status_code >= 400:
+            return None
+        else:
+            robots.parse(response.text.splitlines())
+        logger.info("🤖 CRAWLER: Loaded %s", robots_url)
+        return robots
 
+    async def _prefetch_canonical(self, url: str) -> Optional[str]:
+        """Read a page's canonical URL from its headers or first 64 KiB without a browser."""
+        try:
+            headers = {"Range": f"bytes=0-{CANONICAL_PREFETCH_BYTES - 1}"}
+            async with self._http.stream("GET", url, headers=headers) as response:
+                canonical = response.links.get("canonical", {}).get("url")
+                if canonical:
+                    return canonicalize_url(urljoin(str(response.url), canonical))
+
+                head = b""
+                async for chunk in response.aiter_bytes():
+                    head += chunk
+                    if len(head) >= CANONICAL_PREFETCH_BYTES:
+                        break
+        except httpx.HTTPError as e:
+            logger.debug("Canonical precheck failed for %s: %s", url, e)
+            return None
+
+        tag = _CANONICAL_TAG_RE.search(head)
+        href = _HREF_ATTR_RE.search(tag.group(0)) if tag else None
+        if not href:
+            return None
+        return canonicalize_url(urljoin(str(response.url), href.group(1).decode("ascii", "ignore")))
+
+    async def _extract_page_graph(self, page: Page, base_url: str) -> Dict[str, Any]:
+        """Collect a page's title, same-site links and buttons with a single in-page evaluation."""
+        return await page.evaluate(PAGE_GRAPH_JS, base_url)
+
+    def _extract_links(self, raw_links: List[Dict[str, str]], base_url: str) -> List[Tuple[str, int]]:
+        """Extract internal (url, depth) links, prioritizing top-level navigation."""
         # Filter to same-origin links only and categorize by depth
         top_level_links = []  # e.g., github.com/about
         deeper_links = []     # e.g., github.com/solutions/industry/manufacturing
+        seen = {base_url}  # Deduplicate as we go; the base URL is never re-queued
 
-        for link in links:
-            if link.startswith(base_url) and link not in self.visited_urls:
-                # Remove fragments and query params for deduplication
-                clean_link = link.split("#")[0].split("?")[0].rstrip("/")
-
-                # Skip if same as base URL
-                if clean_link == base_url.rstrip("/"):
-                    continue
+        for link in raw_links:
+            if not link["url"]:
+                continue
+            # Remove fragments and query params for deduplication
+            clean_link = canonicalize_url(link["url"])
+            if clean_link in seen or clean_link in self._queued or not clean_link.startswith(base_url):
+                continue
+            seen.add(clean_link)
 
-                # Use the new depth calculation method
-                depth = self._calculate_url_depth(clean_link, base_url)
+            # Use the new depth calculation method
+            depth = self._calculate_url_depth(clean_link, base_url)
 
-                # Prioritize top-level links (depth 1-2)
-                if depth <= 2:
-                    top_level_links.append(clean_link)
-                else:
-                    deeper_links.append(clean_link)
+            # Prioritize top-level links (depth 1-2)
+            if depth <= 2:
+                top_level_links.append((clean_link, depth))
+            else:
+                deeper_links.append((clean_link, depth))
 
         # Return top-level links first, then deeper ones
-        all_links = list(set(top_level_links)) + list(set(deeper_links))
-        print(f"🔗 LINK PRIORITY: {len(top_level_links)} top-level, {len(deeper_links)} deeper links")
+        all_links = top_level_links + deeper_links
+        logger.debug("🔗 LINK PRIORITY: %s top-level, %s deeper links", len(top_level_links), len(deeper_links))
         return all_links
 
-    async def _add_element_actions(self, element: PageElement, element_id: str):
-        """Add possible actions for an element to the graph."""
-        # Determine possible actions based on element type
-        if element.element_type in ["button", "input[type='button']", "input[type='submit']"]:
-            self.graph_db.add_action(element_id, "click")
-        elif element.element_type == "link":
-            # For links, we'll add the target URL when we create page relationships
-            self.graph_db.add_action(element_id, "click")
-        elif element.element_type in ["input", "textarea"]:
-            input_type = element.attributes.get("type", "text")
-            if input_type in ["text", "email", "password", "search", "tel", "url"]:
-                self.graph_db.add_action(element_id, "fill")
-            elif input_type in ["checkbox", "radio"]:
-                self.graph_db.add_action(element_id, "check")
-        elif element.element_type == "select":
-            self.graph_db.add_action(element_id, "select")
-
-    async def _create_page_links(self, page: Page, page_id_map: dict, base_url: str):
-        """Create LINKS_TO relationships between pages after crawling."""
+    def _element_actions(self, element_type: str, attributes: Dict[str, Any]) -> List[str]:
+        """Possible action types for an element, stored alongside it in the graph."""
+        if element_type in ("input", "textarea"):
+            action = INPUT_ACTIONS.get(attributes.get("type", "text"))
+            return [action] if action else []
+        return list(ELEMENT_ACTIONS.get(element_type, ()))
+
+    def _create_page_links(self, page_id_map: dict, base_url: str):
+        """Create LINKS_TO relationships from the links recorded while crawling."""
+        links = {}  # (from, to) -> row; the first anchor's text wins, as with MERGE ... ON CREATE
         for from_url, from_page_id in page_id_map.items():
-            try:
-                await page.goto(from_url, timeout=self.config.crawler.timeout)
-                
-                # Get all links on this page
-                link_elements = await page.query_selector_all("a[href]")
-                for link_elem in link_elements:
-                    try:
-                        href = await link_elem.get_attribute("href")
-                        if href and href.startswith(base_url):
-                            clean_href = href.split("#")[0].split("?")[0]
-                            if clean_href in page_id_map:
-                                link_text = await link_elem.text_content()
-                                self.graph_db.link_pages(
-                                    from_page_id, 
-                                    page_id_map[clean_href], 
-                                    link_text
-                                )
-                    except Exception as e:
-                        print(f"Error processing link: {e}")
-                        continue
-            except Exception as e:
-                print(f"Error creating links for {from_url}: {e}")
-                continue
+            for link in self.edges_by_url.get(from_url, ()):
+                if not link["url"]:
+                    continue
+                clean_href = canonicalize_url(link["url"])
+                if not clean_href.startswith(base_url):
+                    continue
+                to_page_id = page_id_map.get(clean_href)
+                if not to_page_id or to_page_id == from_page_id:
+                    continue
+                links.setdefault((from_page_id, to_page_id), {
+                    "from_page_id": from_page_id,
+                    "to_page_id": to_page_id,
+                    "link_text": link["text"],
+                })
+
+        try:
+            self.graph_db.link_pages_bulk(list(links.values()))
+        except Exception as e:
+            logger.warning("⚠️ CRAWLER: Failed to create navigation links: %s", e)
+
+    def _write_screenshot(self, path: Path, image: bytes):
+        """Write captured screenshot bytes to disk."""
+        try:
+            path.write_bytes(image)
+            logger.debug("📸 PAGE: Screenshot saved to %s", path)
+        except OSError as e:
+            logger.error("❌ PAGE: Failed to save screenshot %s: %s", path, e)
 
     def _get_screenshot_path(self, url: str) -> Path:
         """Generate screenshot path for a URL."""
         parsed_url = urlparse(url)
         url_part = parsed_url.path.strip("/") or "home"
         filename = sanitize_filename(url_part)
-        screenshots_dir = Path(self.config.storage.artifacts_path) / "screenshots" / self.crawl_id
-        screenshots_dir.mkdir(parents=True, exist_ok=True)
-        return screenshots_dir / f"{filename}.png"
\ No newline at end of file
+        extension = "jpg" if self.config.crawler.screenshot_type == "jpeg" else "png"
+        return self._screenshots_dir / f"{filename}.{extension}"
\ No newline at end of file
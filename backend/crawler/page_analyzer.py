@@ -1,219 +1,355 @@
 """Analyze page structure to extract elements, actions, and forms."""
 
+import logging
 from typing import List, Dict, Any, Optional
 from playwright.async_api import Page
 from backend.shared.types import PageElement, PageAction, ActionType, SelectorStrategy
-import re
 
+logger = logging.getLogger(__name__)
+
+
+# Elements of each type kept per page; larger pages are sampled
+DEFAULT_MAX_PER_TYPE = 500
+
+# Union of every interactive element the analyzer understands; one shared string
+# so each page runs the same single query
+INTERACTIVE_SELECTOR = "button, a[href], input, textarea, select"
+
+# One pass over the DOM returning everything extract_elements/extract_forms
+# need, so analysing a page costs a single round-trip instead of several per element.
+PAGE_SNAPSHOT_JS = """
+({selector, includeHidden, maxPerType}) => {
+    const COMMON_ATTRS = [
+        'id', 'name', 'class', 'title', 'alt', 'tabindex', 'role',
+        'aria-label', 'aria-describedby', 'aria-required', 'aria-hidden',
+        'aria-expanded', 'aria-controls', 'aria-checked',
+    ];
+    // Only keep the attributes that mean something for each element type
+    const WANTED_ATTRS = {
+        button: new Set([...COMMON_ATTRS, 'type', 'value']),
+        link: new Set([...COMMON_ATTRS, 'href', 'rel', 'target']),
+        input: new Set([...COMMON_ATTRS, 'type', 'placeholder', 'value']),
+        textarea: new Set([...COMMON_ATTRS, 'placeholder']),
+        select: new Set(COMMON_ATTRS),
+    };
+    const JS_EVENTS = new Set(['onclick', 'onsubmit', 'onchange', 'onmousedown', 'onmouseup', 'ondblclick']);
+    const buckets = {button: [], link: [], input: [], textarea: [], select: []};
+
+    const elementType = (el) => {
+        switch (el.tagName) {
+            case 'BUTTON': return 'button';
+            case 'A': return 'link';
+            case 'TEXTAREA': return 'textarea';
+            case 'SELECT': return 'select';
+        }
+        const type = (el.getAttribute('type') || '').toLowerCase();
+        if (type === 'hidden') return null;
+        return type === 'button' || type === 'submit' ? 'button' : 'input';
+    };
+
+    // Fixed-seed PRNG (mulberry32) so the same page always yields the same sample,
+    // keeping app maps and prompts reproducible across crawls
+    let seed = 0x9e3779b9;
+    const random = () => {
+        seed = (seed + 0x6d2b79f5) | 0;
+        let t = Math.imul(seed ^ (seed >>> 15), 1 | seed);
+        t = (t + Math.imul(t ^ (t >>> 7), 61 | t)) ^ t;
+        return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+    };
+
+    // First pass: classify and filter, keeping at most maxPerType nodes per type by
+    // reservoir sampling (Algorithm R) so the expensive per-element reads stay bounded
+    const reservoirs = {button: [], link: [], input: [], textarea: [], select: []};
+    const seen = {button: 0, link: 0, input: 0, textarea: 0, select: 0};
+    let index = 0;
+    for (const el of document.querySelectorAll(selector)) {
+        const type = elementType(el);
+        if (!type) continue;  // Hidden inputs can never be interacted with
+        const rect = el.getBoundingClientRect();
+        const visible = rect.width > 0 && rect.height > 0 && getComputedStyle(el).visibility !== 'hidden';
+        // Hidden buttons and links are mostly menu items and templates; form fields can legitimately be off-screen
+        if (!visible && !includeHidden && (type === 'button' || type === 'link')) continue;
+
+        const entry = {el, type, visible, index: index++};
+        const reservoir = reservoirs[type];
+        const n = ++seen[type];
+        if (reservoir.length < maxPerType) {
+            reservoir.push(entry);
+        } else {
+            const slot = Math.floor(random() * n);
+            if (slot < maxPerType) reservoir[slot] = entry;
+        }
+    }
+
+    // Second pass: read attributes for the kept nodes only, in document order within each type
+    for (const type of Object.keys(reservoirs)) {
+        const wanted = WANTED_ATTRS[type];
+        for (const {el, visible} of reservoirs[type].sort((a, b) => a.index - b.index)) {
+            const attrs = {};
+            const data = {};
+            const events = {};
+            for (const {name, value} of el.attributes) {
+                if (wanted.has(name)) {
+                    if (value) attrs[name] = value;
+                } else if (name.startsWith('data-')) {
+                    data[name] = value;
+                } else if (JS_EVENTS.has(name) && value) {
+                    events[name] = value.slice(0, 200);
+                }
+            }
+            buckets[type].push({
+                element_type: type,
+                text: el.textContent,
+                attrs,
+                data,
+                events,
+                disabled: el.disabled === true || el.getAttribute('aria-disabled') === 'true',
+                visible,
+            });
+        }
+    }
+
+    const forms = [];
+    for (const form of document.forms) {
+        const fields = [];
+        for (const field of form.querySelectorAll('input, textarea, select')) {
+            const name = field.getAttribute('name');
+            if (name) {
+                fields.push({
+                    name,
+                    type: field.getAttribute('type') || 'text',
+                    required: field.hasAttribute('required'),
+                });
+            }
+        }
+        if (fields.length) {
+            forms.push({
+                action: form.getAttribute('action'),
+                method: form.getAttribute('method') || 'GET',
+                fields,
+            });
+        }
+    }
+
+    return {
+        elements: [].concat(buckets.button, buckets.link, buckets.input, buckets.textarea, buckets.select),
+        forms,
+    };
+}
+"""
+
+
+# Lightweight page content for embeddings: title, meta description, h1s and a text snippet
+PAGE_CONTENT_JS = """
+() => {
+    // Every part is whitespace-normalized here so Python only has to join them
+    const clean = s => (s || '').replace(/\\s+/g, ' ').trim();
+
+    // Title
+    const title = clean(document.title);
+
+    // Meta description
+    const metaDesc = clean(document.querySelector('meta[name="description"]')?.content);
+
+    // H1 tags only (most important)
+    const h1s = Array.from(document.querySelectorAll('h1'))
+        .map(h => clean(h.textContent))
+        .filter(t => t);
+
+    // First 500 chars of visible text (MUCH faster than full body)
+    const mainContent = document.querySelector('main, article, [role="main"], body');
+    const text = clean(mainContent?.textContent).substring(0, 500).trimEnd();
+
+    return {
+        title,
+        meta_description: metaDesc,
+        h1_tags: h1s,
+        content_snippet: text
+    };
+}
+"""
 
-class PageAnalyzer:
-    """Analyzes page structure to extract testable elements and actions."""
 
-    async def extract_elements(self, page: Page) -> List[PageElement]:
-        """Extract interactive elements from the page."""
+class PageAnalyzer:
+    """Analyzes page structure to extract testable elements and actions.
+
+    Holds no per-page state, so one instance can be shared by concurrent crawl
+    workers and used on pages from long-lived, reused browser contexts.
+    """
+
+    async def analyze(self, page: Page, include_hidden: bool = False,
+                      max_per_type: int = DEFAULT_MAX_PER_TYPE) -> Dict[str, Any]:
+        """Extract elements, actions and forms from a single page snapshot.
+
+        Prefer this over calling extract_elements and extract_forms separately,
+        which each read the page again. Invisible buttons and links
+        are skipped unless include_hidden is set, and each element type is
+        reservoir-sampled down to max_per_type on very large pages.
+        """
+        snapshot = await self._snapshot(page, include_hidden, max_per_type)
+        elements = self._build_elements(snapshot)
+        return {
+            "elements": elements,
+            "actions": self.extract_actions(elements),
+            "forms": snapshot["forms"],
+        }
+
+    async def extract_elements(self, page: Page, include_hidden: bool = False,
+                               max_per_type: int = DEFAULT_MAX_PER_TYPE) -> List[PageElement]:
+        """Extract interactive elements from the page, skipping invisible buttons and links by default."""
+        return self._build_elements(await self._snapshot(page, include_hidden, max_per_type))
+
+    def _build_elements(self, snapshot: Dict[str, Any]) -> List[PageElement]:
+        """Create PageElements for every usable record in a snapshot."""
         elements = []
-
-        # Extract buttons
-        buttons = await page.query_selector_all("button, input[type='button'], input[type='submit']")
-        for btn in buttons:
-            element = await self._create_element(btn, "button")
+        for record in snapshot["elements"]:
+            element = self._create_element(record, record["element_type"])
             if element:
                 elements.append(element)
-
-        # Extract links
-        links = await page.query_selector_all("a[href]")
-        for link in links:
-            element = await self._create_element(link, "link")
-            if element:
-                elements.append(element)
-
-        # Extract inputs
-        inputs = await page.query_selector_all("input:not([type='button']):not([type='submit'])")
-        for inp in inputs:
-            element = await self._create_element(inp, "input")
-            if element:
-                elements.append(element)
-
-        # Extract textareas
-        textareas = await page.query_selector_all("textarea")
-        for textarea in textareas:
-            element = await self._create_element(textarea, "textarea")
-            if element:
-                elements.append(element)
-
-        # Extract selects
-        selects = await page.query_selector_all("select")
-        for select in selects:
-            element = await self._create_element(select, "select")
-            if element:
-                elements.append(element)
-
         return elements
 
-    async def _create_element(self, locator, element_type: str) -> PageElement:
-        """Create a PageElement from a Playwright locator."""
+    async def extract_element_rows(self, page: Page, include_hidden: bool = False,
+                                   max_per_type: int = DEFAULT_MAX_PER_TYPE) -> List[Dict[str, Any]]:
+        """Extract interactive elements as plain dicts, skipping PageElement validation.
+
+        For bulk consumers such as the crawler's graph writes; each dict has the
+        same fields as a PageElement.
+        """
+        snapshot = await self._snapshot(page, include_hidden, max_per_type)
+        rows = []
+        for record in snapshot["elements"]:
+            fields = self._element_fields(record, record["element_type"])
+            if fields:
+                rows.append(fields)
+        return rows
+
+    async def _snapshot(self, page: Page, include_hidden: bool = False,
+                        max_per_type: int = DEFAULT_MAX_PER_TYPE) -> Dict[str, Any]:
+        """Read all interactive elements and forms from the page in one evaluation."""
+        return await page.evaluate(
+            PAGE_SNAPSHOT_JS,
+            {"selector": INTERACTIVE_SELECTOR, "includeHidden": include_hidden, "maxPerType": max_per_type},
+        )
+
+    def _create_element(self, record: Dict[str, Any], element_type: str) -> Optional[PageElement]:
+        """Create a PageElement from a page snapshot record."""
+        fields = self._element_fields(record, element_type)
+        return PageElement(**fields) if fields else None
+
+    def _element_fields(self, record: Dict[str, Any], element_type: str) -> Optional[Dict[str, Any]]:
+        """Choose a selector for a snapshot record and return PageElement fields as a dict."""
         try:
+            attrs = record["attrs"]
+            text = record["text"]
+            attributes = self._get_attributes(record)
+
             # Try different selector strategies in order of preference
-            test_id = await locator.get_attribute("data-testid")
+            test_id = record["data"].get("data-testid")
             if test_id:
-                return PageElement(
+                return dict(
                     selector=f"[data-testid='{test_id}']",
                     selector_strategy=SelectorStrategy.TEST_ID,
                     element_type=element_type,
-                    text=await locator.text_content(),
-                    attributes=await self._get_attributes(locator),
+                    text=text,
+                    attributes=attributes,
                 )
 
-            aria_label = await locator.get_attribute("aria-label")
+            aria_label = attrs.get("aria-label")
             if aria_label:
-                return PageElement(
+                return dict(
                     selector=aria_label,
                     selector_strategy=SelectorStrategy.ARIA_LABEL,
                     element_type=element_type,
-                    text=await locator.text_content(),
-                    attributes=await self._get_attributes(locator),
+                    text=text,
+                    attributes=attributes,
                 )
 
-            text = await locator.text_content()
-            if text and text.strip():
-                return PageElement(
-                    selector=text.strip(),
+            stripped_text = text.strip() if text else ""
+            if stripped_text:
+                return dict(
+                    selector=stripped_text,
                     selector_strategy=SelectorStrategy.TEXT,
                     element_type=element_type,
-                    text=text.strip(),
-                    attributes=await self._get_attributes(locator),
+                    text=stripped_text,
+                    attributes=attributes,
                 )
 
             # Fall back to generating a CSS selector
-            element_id = await locator.get_attribute("id")
+            element_id = attrs.get("id")
             if element_id:
                 selector = f"#{element_id}"
             else:
-                class_name = await locator.get_attribute("class")
+                class_name = attrs.get("class")
                 if class_name:
-                    selector = f".{class_name.split()[0]}"
+                    selector = f".{class_name.split(None, 1)[0]}"
                 else:
-                    name = await locator.get_attribute("name")
+                    name = attrs.get("name")
                     selector = f"[name='{name}']" if name else element_type
 
-            return PageElement(
+            return dict(
                 selector=selector,
                 selector_strategy=SelectorStrategy.CSS,
                 element_type=element_type,
-                text=await locator.text_content(),
-                attributes=await self._get_attributes(locator),
+                text=text,
+                attributes=attributes,
             )
         except Exception as e:
-            print(f"Error creating element: {e}")
+            logger.debug("Error creating element: %s", e)
             return None
 
-    async def _get_attributes(self, locator) -> Dict[str, Any]:
-        """Extract detailed attributes from an element (inspired by graph_redo)."""
-        attrs = {}
-        
-        # Standard attributes
-        standard_attrs = ["id", "name", "class", "type", "placeholder", "value", "href", 
-                         "title", "alt", "rel", "target", "tabindex", "role"]
-        
-        for attr in standard_attrs:
-            try:
-                value = await locator.get_attribute(attr)
-                if value:
-                    attrs[attr] = value
-            except:
-                pass
-        
-        # Aria attributes for accessibility
-        aria_attrs = ["aria-label", "aria-describedby", "aria-required", "aria-hidden", 
-                     "aria-expanded", "aria-controls", "aria-checked"]
-        
-        for attr in aria_attrs:
-            try:
-                value = await locator.get_attribute(attr)
-                if value:
-                    attrs[attr] = value
-            except:
-                pass
-        
+    def _get_attributes(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Assemble detailed attributes from a snapshot record (inspired by graph_redo)."""
+        # Standard and aria attributes, already filtered to non-empty values in the page
+        attrs = dict(record["attrs"])
+
         # JavaScript event handlers
-        js_events = ["onclick", "onsubmit", "onchange", "onmousedown", "onmouseup", "ondblclick"]
-        js_events_found = {}
-        for event in js_events:
-            try:
-                value = await locator.get_attribute(event)
-                if value:
-                    js_events_found[event] = value[:200]  # Limit length
-            except:
-                pass
-        
-        if js_events_found:
-            attrs["js_events"] = str(js_events_found)
-        
+        if record["events"]:
+            attrs["js_events"] = str(record["events"])
+
         # Data attributes (custom data-* attributes)
-        try:
-            # Get all attributes using evaluate
-            all_attrs = await locator.evaluate("""
-                el => {
-                    const dataAttrs = {};
-                    for (let attr of el.attributes) {
-                        if (attr.name.startsWith('data-')) {
-                            dataAttrs[attr.name] = attr.value;
-                        }
-                    }
-                    return dataAttrs;
-                }
-            """)
-            if all_attrs:
-                attrs["data_attributes"] = str(all_attrs)
-        except:
-            pass
-        
+        if record["data"]:
+            attrs["data_attributes"] = str(record["data"])
+
         # Disabled state
-        try:
-            disabled = await locator.is_disabled()
-            if disabled:
-                attrs["disabled"] = "true"
-        except:
-            pass
-        
+        if record["disabled"]:
+            attrs["disabled"] = "true"
+
         # Visible state
-        try:
-            visible = await locator.is_visible()
-            attrs["visible"] = str(visible)
-        except:
-            pass
-        
+        attrs["visible"] = str(record["visible"])
+
         return attrs
 
-    async def extract_actions(self, page: Page) -> List[PageAction]:
-        """Extract possible actions from the page."""
+    def extract_actions(self, elements: List[PageElement]) -> List[PageAction]:
+        """Derive possible actions from elements returned by extract_elements, without touching the page."""
         actions = []
+        seen = set()
 
-        # Click actions for buttons and links
-        clickable = await page.query_selector_all("button, a[href], input[type='button'], input[type='submit']")
-        for elem in clickable:
-            element = await self._create_element(elem, "clickable")
-            if element:
+        for element in elements:
+            # Repeated controls (nav menus, per-row "Delete" buttons) only need one action
+            key = (element.element_type, element.selector, (element.text or "").strip()[:40])
+            if key in seen:
+                continue
+            seen.add(key)
+
+            # Click actions for buttons and links
+            if element.element_type in ("button", "link"):
                 text = element.text or element.attributes.get("value", "")
                 actions.append(
                     PageAction(
                         action_type=ActionType.CLICK,
-                        element=element,
+                        element=element.model_copy(update={"element_type": "clickable"}),
                         description=f"Click {text or element.selector}",
                     )
                 )
 
-        # Fill actions for inputs and textareas
-        fillable = await page.query_selector_all("input:not([type='button']):not([type='submit']), textarea")
-        for elem in fillable:
-            element = await self._create_element(elem, "input")
-            if element:
+            # Fill actions for inputs and textareas
+            elif element.element_type in ("input", "textarea"):
                 placeholder = element.attributes.get("placeholder", "")
                 name = element.attributes.get("name", "")
                 actions.append(
                     PageAction(
                         action_type=ActionType.FILL,
-                        element=element,
+                        element=element.model_copy(update={"element_type": "input"}),
                         description=f"Fill {name or placeholder or element.selector}",
                     )
                 )
@@ -222,36 +358,8 @@ class PageAnalyzer:
 
     async def extract_forms(self, page: Page) -> List[Dict[str, Any]]:
         """Extract form structures from the page."""
-        forms = []
-
-        form_elements = await page.query_selector_all("form")
-        for form_elem in form_elements:
-            try:
-                form_data = {
-                    "action": await form_elem.get_attribute("action"),
-                    "method": await form_elem.get_attribute("method") or "GET",
-                    "fields": [],
-                }
-
-                # Extract form fields
-                fields = await form_elem.query_selector_all("input, textarea, select")
-                for field in fields:
-                    field_type = await field.get_attribute("type") or "text"
-                    field_name = await field.get_attribute("name")
-                    if field_name:
-                        form_data["fields"].append({
-                            "name": field_name,
-                            "type": field_type,
-                            "required": await field.get_attribute("required") is not None,
-                        })
-
-                if form_data["fields"]:
-                    forms.append(form_data)
-            except Exception as e:
-                print(f"Error extracting form: {e}")
-                continue
-
-        return forms
+        snapshot = await self._snapshot(page)
+        return snapshot["forms"]
     
     async def extract_page_content(self, page: Page) -> Dict[str, Any]:
         """Extract FAST, lightweight page content for AI embeddings."""
@@ -259,32 +367,7 @@ class PageAnalyzer:
             content_data = {}
 
             # Extract everything in ONE evaluate call for speed
-            extracted = await page.evaluate("""
-                () => {
-                    // Title
-                    const title = document.title || '';
-
-                    // Meta description
-                    const metaDesc = document.querySelector('meta[name="description"]')?.content || '';
-
-                    // H1 tags only (most important)
-                    const h1s = Array.from(document.querySelectorAll('h1'))
-                        .map(h => h.textContent?.trim())
-                        .filter(t => t);
-
-                    // First 500 chars of visible text (MUCH faster than full body)
-                    const mainContent = document.querySelector('main, article, [role="main"], body');
-                    let text = mainContent?.textContent || '';
-                    text = text.replace(/\\s+/g, ' ').trim().substring(0, 500);
-
-                    return {
-                        title,
-                        meta_description: metaDesc,
-                        h1_tags: h1s,
-                        content_snippet: text
-                    };
-                }
-            """)
+            extracted = await page.evaluate(PAGE_CONTENT_JS)
 
             content_data = {
                 "title": extracted.get("title", ""),
@@ -306,16 +389,15 @@ class PageAnalyzer:
             # Add content snippet
             embedding_text_parts.append(content_data.get("content_text", ""))
 
-            # Combine and clean
+            # Combine; parts arrive whitespace-normalized from the page
             embedding_text = " ".join([p for p in embedding_text_parts if p])
-            embedding_text = re.sub(r'\s+', ' ', embedding_text).strip()
 
             content_data["embedding_text"] = embedding_text[:2000]  # Limit to 2000 chars (much faster)
 
             return content_data
             
         except Exception as e:
-            print(f"❌ Error extracting page content: {e}")
+            logger.error("❌ Error extracting page content: %s", e)
             return {
                 "title": "",
                 "meta_description": "",
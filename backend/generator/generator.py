@@ -1,47 +1,210 @@
 """Generate test cases from app map using Claude."""
 
+import asyncio
+import hashlib
 import json
+import logging
+import re
+import threading
 from pathlib import Path
-from anthropic import Anthropic
+from typing import Any, List, Optional
+import httpx
+from anthropic import Anthropic, AsyncAnthropic
+from pydantic import TypeAdapter
 from backend.shared.types import AppMap, TestSuite, TestCase
 from backend.shared.config import get_config
-from backend.shared.utils import generate_id, save_json
+from backend.shared.utils import generate_id, load_json, parse_json, save_json
 from .prompts import SYSTEM_PROMPT, USER_PROMPT_TEMPLATE
 
+logger = logging.getLogger(__name__)
+
+# A full-length generation can take minutes to come back, but a connect should be quick
+LLM_TIMEOUT = httpx.Timeout(300.0, connect=5.0)
+LLM_MAX_RETRIES = 2
+
+# Default number of suites generate_many works on at once
+DEFAULT_GENERATION_CONCURRENCY = 5
+
+# App map summaries longer than this are split across several Claude calls
+MAX_SUMMARY_CHARS = 40000
+
+# Body of a markdown code block; an unterminated block runs to the end of the text
+_CODE_BLOCK_RE = re.compile(r"```(?:json)?\s*(.*?)(?:```|\Z)", re.DOTALL)
+# Possible starts of a bare JSON value in free text
+_JSON_START_RE = re.compile(r"[\[{]")
+
+# Validates a parsed list of test cases in one call
+_TEST_CASE_LIST = TypeAdapter(List[TestCase])
+
 
 class TestGenerator:
     """Generate test cases from application map using Claude LLM."""
 
+    # Shared by every generator so its connection pool outlives a single request
+    _client: Optional[Anthropic] = None
+    _client_lock = threading.Lock()
+
     def __init__(self):
         self.config = get_config()
-        self.client = Anthropic(api_key=self.config.llm.api_key)
+        self._aclient: Optional[AsyncAnthropic] = None
+
+    @property
+    def client(self) -> Anthropic:
+        """The process-wide Anthropic client, created on first use."""
+        if TestGenerator._client is None:
+            with TestGenerator._client_lock:
+                if TestGenerator._client is None:
+                    TestGenerator._client = Anthropic(
+                        api_key=self.config.llm.api_key,
+                        max_retries=LLM_MAX_RETRIES,
+                        timeout=LLM_TIMEOUT,
+                    )
+        return TestGenerator._client
+
+    @property
+    def aclient(self) -> AsyncAnthropic:
+        """Async Anthropic client for this generator, created on first use.
+
+        Kept per instance rather than shared, since its connection pool is tied
+        to the event loop it was first used on.
+        """
+        if self._aclient is None:
+            self._aclient = AsyncAnthropic(
+                api_key=self.config.llm.api_key,
+                max_retries=LLM_MAX_RETRIES,
+                timeout=LLM_TIMEOUT,
+            )
+        return self._aclient
 
     def generate_tests(self, app_map: AppMap) -> TestSuite:
         """Generate test suite from app map."""
-        print("Generating test cases with Claude...")
-
-        # Prepare app map summary for the LLM
-        app_map_summary = self._create_app_map_summary(app_map)
-
-        # Call Claude
-        response = self.client.messages.create(
-            model=self.config.llm.model,
-            max_tokens=self.config.llm.max_tokens,
-            temperature=self.config.llm.temperature,
-            system=SYSTEM_PROMPT,
-            messages=[
-                {
-                    "role": "user",
-                    "content": USER_PROMPT_TEMPLATE.format(
-                        base_url=app_map.base_url,
-                        app_map_summary=app_map_summary,
-                    ),
-                }
-            ],
+        logger.info("Generating test cases with Claude...")
+
+        response_texts = [self._response_text(request) for request in self._message_requests(app_map)]
+
+        test_suite = self._build_test_suite(app_map, response_texts)
+        self._save_test_suite(test_suite)
+        return test_suite
+
+    async def generate_tests_async(self, app_map: AppMap) -> TestSuite:
+        """Generate test suite from app map without blocking the event loop.
+
+        When the app map is split across several Claude calls, they run concurrently.
+        """
+        logger.info("Generating test cases with Claude...")
+
+        response_texts = await asyncio.gather(
+            *(self._response_text_async(request) for request in self._message_requests(app_map))
         )
 
-        # Parse response
-        test_cases = self._parse_response(response.content[0].text)
+        test_suite = self._build_test_suite(app_map, response_texts)
+        # Write from a thread so concurrent generations are not held up by disk I/O
+        await asyncio.to_thread(self._save_test_suite, test_suite)
+        return test_suite
+
+    async def generate_many(self, app_maps: List[AppMap],
+                            concurrency: int = DEFAULT_GENERATION_CONCURRENCY) -> List[TestSuite]:
+        """Generate a test suite for each app map, with at most `concurrency` suites in progress."""
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def generate_one(app_map: AppMap) -> TestSuite:
+            async with semaphore:
+                return await self.generate_tests_async(app_map)
+
+        return await asyncio.gather(*(generate_one(app_map) for app_map in app_maps))
+
+    def _response_text(self, request: dict) -> str:
+        """Claude's response text for a request, from the cache when possible."""
+        cache_path = self._cache_path(request)
+        response_text = self._load_cached_response(cache_path)
+
+        if response_text is None:
+            # Call Claude, streaming so the read timeout applies between chunks
+            # rather than to the whole generation
+            with self.client.messages.stream(**request) as stream:
+                response_text = "".join(stream.text_stream)
+            self._store_cached_response(cache_path, response_text)
+
+        return response_text
+
+    async def _response_text_async(self, request: dict) -> str:
+        """Async variant of _response_text."""
+        cache_path = self._cache_path(request)
+        response_text = self._load_cached_response(cache_path)
+
+        if response_text is None:
+            async with self.aclient.messages.stream(**request) as stream:
+                response_text = "".join([text async for text in stream.text_stream])
+            await asyncio.to_thread(self._store_cached_response, cache_path, response_text)
+
+        return response_text
+
+    def _message_requests(self, app_map: AppMap) -> List[dict]:
+        """Keyword arguments for each Claude messages call needed to cover an app map."""
+        # Prepare app map summaries for the LLM, one per call
+        return [
+            dict(
+                model=self.config.llm.model,
+                max_tokens=self.config.llm.max_tokens,
+                temperature=self.config.llm.temperature,
+                system=SYSTEM_PROMPT,
+                messages=[
+                    {
+                        "role": "user",
+                        "content": USER_PROMPT_TEMPLATE.format(
+                            base_url=app_map.base_url,
+                            app_map_summary=app_map_summary,
+                        ),
+                    }
+                ],
+            )
+            for app_map_summary in self._create_app_map_summaries(app_map)
+        ]
+
+    def _cache_path(self, request: dict) -> Optional[Path]:
+        """Cache file for a Claude request, or None when response caching is disabled.
+
+        The key covers the model, sampling settings and both prompts, so any
+        change to the app map or configuration misses the cache.
+        """
+        if not self.config.llm.cache_enabled:
+            return None
+        key = hashlib.sha256(json.dumps(request, sort_keys=True).encode()).hexdigest()
+        return Path(self.config.storage.llm_cache_path) / f"{key}.json"
+
+    def _load_cached_response(self, cache_path: Optional[Path]) -> Optional[str]:
+        """Return a cached response text, if there is one."""
+        if cache_path is None or not cache_path.exists():
+            return None
+        try:
+            response_text = load_json(cache_path)["response_text"]
+        except Exception as e:
+            logger.warning("Ignoring unreadable LLM cache entry %s: %s", cache_path, e)
+            return None
+        logger.info("Using cached LLM response: %s", cache_path)
+        return response_text
+
+    def _store_cached_response(self, cache_path: Optional[Path], response_text: str) -> None:
+        """Cache a response text for identical future requests."""
+        if cache_path is not None:
+            save_json({"response_text": response_text}, cache_path)
+
+    def _build_test_suite(self, app_map: AppMap, response_texts: List[str]) -> TestSuite:
+        """Parse Claude's responses into a single TestSuite."""
+        # Parse responses, keeping test IDs unique across calls
+        test_cases = []
+        seen_ids = set()
+        suffixes = {}  # Base test ID -> next suffix to try
+        for response_text in response_texts:
+            for test_case in self._parse_response(response_text):
+                base_id = test_id = test_case.test_id
+                # A suffixed name may itself be taken (e.g. the LLM returned foo and foo_2)
+                while test_id in seen_ids:
+                    suffixes[base_id] = suffixes.get(base_id, 1) + 1
+                    test_id = f"{base_id}_{suffixes[base_id]}"
+                test_case.test_id = test_id
+                seen_ids.add(test_id)
+                test_cases.append(test_case)
 
         # Create test suite
         suite_id = generate_id("suite_")
@@ -52,71 +215,107 @@ class TestGenerator:
             test_cases=test_cases,
         )
 
-        # Save test suite
-        self._save_test_suite(test_suite)
-
-        print(f"Generated {len(test_cases)} test cases")
+        logger.info("Generated %s test cases", len(test_cases))
         return test_suite
 
-    def _create_app_map_summary(self, app_map: AppMap) -> str:
-        """Create a concise summary of the app map for the LLM."""
+    def _create_app_map_summaries(self, app_map: AppMap) -> List[str]:
+        """Create concise summaries of the app map for the LLM.
+
+        Large maps are split so each summary stays within MAX_SUMMARY_CHARS and
+        llm.max_pages_per_call pages, bounding the input of every Claude call.
+        """
         summary_parts = []
 
         for i, page in enumerate(app_map.pages, 1):
-            page_summary = f"\nPage {i}: {page.url}\n"
-            page_summary += f"Title: {page.title}\n"
+            parts = [f"\nPage {i}: {page.url}\n", f"Title: {page.title}\n"]
 
             if page.forms:
-                page_summary += "Forms:\n"
+                parts.append("Forms:\n")
                 for i, form in enumerate(page.forms, 1):
                     fields = ", ".join([f["name"] for f in form["fields"]])
                     # Include form selector if available for specificity
                     form_id = form.get("id", "")
                     form_selector = f"#{form_id}" if form_id else form.get("selector", "form")
-                    page_summary += f"  - Form {i} (selector: {form_selector}): {form['method']} with fields: {fields}\n"
+                    parts.append(f"  - Form {i} (selector: {form_selector}): {form['method']} with fields: {fields}\n")
 
             if page.actions:
-                page_summary += f"Actions ({len(page.actions)}):\n"
+                parts.append(f"Actions ({len(page.actions)}):\n")
+                # Drop repeated actions first so the 10 kept are distinct
+                unique_actions = []
+                seen = set()
+                for action in page.actions:
+                    key = (action.action_type, action.element.selector, action.description)
+                    if key not in seen:
+                        seen.add(key)
+                        unique_actions.append(action)
                 # Limit to first 10 actions to avoid token limits
-                for action in page.actions[:10]:
-                    selector_info = f" (selector: {action.element.selector}, strategy: {action.element.selector_strategy.value})" if action.element.selector else ""
-                    page_summary += f"  - {action.description}{selector_info}\n"
+                for action in unique_actions[:10]:
+                    element = action.element
+                    if element.selector:
+                        strategy = element.selector_strategy.value
+                        parts.append(f"  - {action.description} (selector: {element.selector}, strategy: {strategy})\n")
+                    else:
+                        parts.append(f"  - {action.description}\n")
+
+            summary_parts.append("".join(parts))
 
-            summary_parts.append(page_summary)
+        summaries = []
+        chunk, chunk_chars = [], 0
+        for page_summary in summary_parts:
+            if chunk and (chunk_chars + len(page_summary) > MAX_SUMMARY_CHARS
+                          or len(chunk) >= self.config.llm.max_pages_per_call):
+                summaries.append("\n".join(chunk))
+                chunk, chunk_chars = [], 0
+            chunk.append(page_summary)
+            chunk_chars += len(page_summary) + 1
+        summaries.append("\n".join(chunk))
 
-        return "\n".join(summary_parts)
+        return summaries
 
     def _parse_response(self, response_text: str) -> list[TestCase]:
         """Parse Claude's response into TestCase objects."""
         try:
-            # Extract JSON from response (handle markdown code blocks)
-            if "```json" in response_text:
-                json_str = response_text.split("```json")[1].split("```")[0].strip()
-            elif "```" in response_text:
-                json_str = response_text.split("```")[1].split("```")[0].strip()
-            else:
-                json_str = response_text.strip()
-
-            # Parse JSON
-            test_cases_data = json.loads(json_str)
+            # Extract JSON from response (handle markdown code blocks and surrounding prose)
+            test_cases_data = self._extract_json(response_text)
 
             # Convert to TestCase objects
-            test_cases = []
             if isinstance(test_cases_data, dict) and "test_cases" in test_cases_data:
                 test_cases_data = test_cases_data["test_cases"]
 
-            for tc_data in test_cases_data:
-                test_cases.append(TestCase(**tc_data))
-
-            return test_cases
+            return _TEST_CASE_LIST.validate_python(test_cases_data)
 
         except Exception as e:
-            print(f"Error parsing LLM response: {e}")
-            print(f"Response: {response_text}")
+            logger.error("Error parsing LLM response: %s", e)
+            logger.debug("Response: %s", response_text)
             return []
 
+    def _extract_json(self, response_text: str) -> Any:
+        """Return the first JSON value found in Claude's response.
+
+        Code blocks are tried first, in order, so a stray non-JSON block does
+        not hide a later one. Otherwise the first balanced object or array in
+        the text is decoded, ignoring anything after it.
+        """
+        for match in _CODE_BLOCK_RE.finditer(response_text):
+            block = match.group(1).strip()
+            if block:
+                try:
+                    return parse_json(block)
+                except ValueError:
+                    continue
+
+        decoder = json.JSONDecoder()
+        for match in _JSON_START_RE.finditer(response_text):
+            try:
+                return decoder.raw_decode(response_text, match.start())[0]
+            except ValueError:
+                continue
+
+        # Nothing usable found; let the caller report the original text
+        return parse_json(response_text.strip())
+
     def _save_test_suite(self, test_suite: TestSuite) -> None:
         """Save test suite to file."""
         output_path = Path(self.config.storage.test_specs_path) / f"{test_suite.suite_id}.json"
         save_json(test_suite.model_dump(), output_path)
-        print(f"Test suite saved to: {output_path}")
\ No newline at end of file
+        logger.info("Test suite saved to: %s", output_path)
\ No newline at end of file
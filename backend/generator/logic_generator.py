@@ -7,6 +7,24 @@ from backend.shared.types import AppMap, TestSuite, TestCase, TestStep, ActionTy
 from backend.shared.config import get_config
 from backend.shared.utils import generate_id
 
+# Valid test data by field, checked in order: (input type, name keyword, value)
+TYPED_TEST_DATA = (
+    ("email", "email", "test.user@example.com"),
+    ("password", "password", "SecurePass123!"),
+    ("tel", "phone", "+1-555-123-4567"),
+    ("url", "website", "https://example.com"),
+    ("number", "age", "25"),
+)
+# Refinements for fields whose name contains "name"
+NAME_TEST_DATA = (("first", "John"), ("last", "Doe"))
+# Remaining name keywords
+KEYWORD_TEST_DATA = (
+    ("address", "123 Main Street"),
+    ("city", "New York"),
+    ("zip", "10001"),
+    ("postal", "10001"),
+)
+
 
 class LogicTestGenerator:
     """Generate comprehensive logic tests for forms, APIs, and user workflows."""
@@ -34,14 +52,23 @@ class LogicTestGenerator:
         """Generate validation tests for a single form."""
         test_cases = []
         form_name = form.get('id', f'form_{form_idx}')
+
+        # Steps that are identical in every test of this form; steps are never
+        # modified after construction, so the test cases can share them
+        goto_step = TestStep(
+            action=ActionType.GOTO,
+            url=str(page_url),
+            description=f"Navigate to {page_url}"
+        )
+        submit_step = TestStep(
+            action=ActionType.CLICK,
+            selector="button[type='submit']",
+            description="Submit form"
+        )
         
         # Test 1: Empty form submission
         empty_test_steps = [
-            TestStep(
-                action=ActionType.GOTO,
-                url=str(page_url),
-                description=f"Navigate to {page_url}"
-            ),
+            goto_step,
             TestStep(
                 action=ActionType.CLICK,
                 selector=f"form#{form_name} button[type='submit']" if form.get('id') else "button[type='submit']",
@@ -68,22 +95,14 @@ class LogicTestGenerator:
         for field in form.get('fields', []):
             if field.get('type') == 'email':
                 invalid_test_steps = [
-                    TestStep(
-                        action=ActionType.GOTO,
-                        url=str(page_url),
-                        description=f"Navigate to {page_url}"
-                    ),
+                    goto_step,
                     TestStep(
                         action=ActionType.FILL,
                         selector=f"input[name='{field['name']}']",
                         value="invalid-email-format",
                         description=f"Enter invalid email in {field['name']}"
                     ),
-                    TestStep(
-                        action=ActionType.CLICK,
-                        selector="button[type='submit']",
-                        description="Submit form"
-                    ),
+                    submit_step,
                     TestStep(
                         action=ActionType.EXPECT,
                         selector=f".error, [data-field='{field['name']}'] .error",
@@ -102,13 +121,7 @@ class LogicTestGenerator:
                 ))
         
         # Test 3: Valid form submission
-        valid_test_steps = [
-            TestStep(
-                action=ActionType.GOTO,
-                url=str(page_url),
-                description=f"Navigate to {page_url}"
-            )
-        ]
+        valid_test_steps = [goto_step]
         
         # Fill each field with valid data
         for field in form.get('fields', []):
@@ -152,32 +165,21 @@ class LogicTestGenerator:
     def _generate_valid_test_data(self, field_type: str, field_name: str) -> str:
         """Generate realistic valid test data based on field type and name."""
         field_name_lower = field_name.lower()
-        
-        if field_type == 'email' or 'email' in field_name_lower:
-            return "test.user@example.com"
-        elif field_type == 'password' or 'password' in field_name_lower:
-            return "SecurePass123!"
-        elif field_type == 'tel' or 'phone' in field_name_lower:
-            return "+1-555-123-4567"
-        elif field_type == 'url' or 'website' in field_name_lower:
-            return "https://example.com"
-        elif field_type == 'number' or 'age' in field_name_lower:
-            return "25"
-        elif 'name' in field_name_lower:
-            if 'first' in field_name_lower:
-                return "John"
-            elif 'last' in field_name_lower:
-                return "Doe"
-            else:
-                return "John Doe"
-        elif 'address' in field_name_lower:
-            return "123 Main Street"
-        elif 'city' in field_name_lower:
-            return "New York"
-        elif 'zip' in field_name_lower or 'postal' in field_name_lower:
-            return "10001"
-        else:
-            return "Valid Test Input"
+
+        for rule_type, keyword, value in TYPED_TEST_DATA:
+            if field_type == rule_type or keyword in field_name_lower:
+                return value
+
+        if 'name' in field_name_lower:
+            for keyword, value in NAME_TEST_DATA:
+                if keyword in field_name_lower:
+                    return value
+            return "John Doe"
+
+        for keyword, value in KEYWORD_TEST_DATA:
+            if keyword in field_name_lower:
+                return value
+        return "Valid Test Input"
 
     def generate_workflow_tests(self, app_map: AppMap) -> List[TestCase]:
         """Generate multi-step workflow tests using AI."""
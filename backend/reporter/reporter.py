@@ -1,12 +1,48 @@
 """Generate HTML reports with AI-powered failure summaries."""
 
+from concurrent.futures import ThreadPoolExecutor
+from html import escape
 from pathlib import Path
-from typing import List
+from string import Template
+from typing import Dict, List
 from anthropic import Anthropic
 from backend.shared.types import TestRunResult, TestResult, TestStatus
 from backend.shared.config import get_config
+from backend.shared.utils import parse_json
 from .template import HTML_REPORT_TEMPLATE
 
+# Most failure summaries requested from Claude at once; the client retries
+# rate-limited (429) calls with backoff on its own
+SUMMARY_CONCURRENCY = 8
+# Output budget per failure; a batched call never exceeds llm.max_tokens in total
+SUMMARY_MAX_TOKENS = 500
+
+STATUS_EMOJI = {
+    TestStatus.PASSED: "✓",
+    TestStatus.FAILED: "✗",
+    TestStatus.SKIPPED: "⊘",
+}
+
+# Markup for one test result, and the failure details block inside it
+RESULT_TEMPLATE = Template("""
+                <div class="test-result $status_class">
+                    <div class="result-header">
+                        <span class="status-icon">$status_emoji</span>
+                        <span class="test-name">$test_id</span>
+                        <span class="duration">${duration_ms}ms</span>
+                    </div>
+                    $error_html
+                </div>
+            """)
+ERROR_DETAILS_TEMPLATE = Template("""
+                    <div class="error-details">
+                        <h4>AI Analysis</h4>
+                        <p>$ai_summary</p>
+                        <h4>Error Message</h4>
+                        <pre>$error_message</pre>
+                    </div>
+                """)
+
 
 class Reporter:
     """Generates rich HTML reports with AI-generated failure summaries."""
@@ -41,19 +77,76 @@ class Reporter:
 
         print(f"Generating AI summaries for {len(failed_tests)} failed tests...")
 
-        for result in failed_tests:
-            if not result.error_message:
-                continue
+        pending = [r for r in failed_tests if r.error_message]
+        if not pending:
+            return summaries
+
+        # One Claude call per batch of failures, with the batches run side by side
+        batch_size = max(1, self.config.llm.summary_batch_size)
+        batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+        with ThreadPoolExecutor(max_workers=min(SUMMARY_CONCURRENCY, len(batches))) as pool:
+            for batch_summaries in pool.map(self._summarize_batch, batches):
+                summaries.update(batch_summaries)
 
+        return summaries
+
+    def _summarize_batch(self, batch: List[TestResult]) -> Dict[str, str]:
+        """Summarize a batch of failures in one call, falling back to one call per failure."""
+        generated = {}
+        if len(batch) > 1:
             try:
-                summary = self._generate_single_summary(result)
-                summaries[result.test_id] = summary
+                generated = self._generate_batch_summary(batch)
             except Exception as e:
-                print(f"Error generating summary for {result.test_id}: {e}")
-                summaries[result.test_id] = "Failed to generate summary"
+                print(f"Error generating batched summaries, falling back to one call per test: {e}")
+
+        summaries = {}
+        for result in batch:
+            summary = generated.get(result.test_id)
+            # Failures the batched answer skipped or garbled get their own call
+            summaries[result.test_id] = summary if isinstance(summary, str) else self._summarize_failure(result)
 
         return summaries
 
+    def _summarize_failure(self, result: TestResult) -> str:
+        """Generate a failure summary, falling back to a placeholder on error."""
+        try:
+            return self._generate_single_summary(result)
+        except Exception as e:
+            print(f"Error generating summary for {result.test_id}: {e}")
+            return "Failed to generate summary"
+
+    def _generate_batch_summary(self, batch: List[TestResult]) -> Dict[str, str]:
+        """Generate AI summaries for several failures with a single request."""
+        failures = "\n\n".join(
+            f"{i}) Test ID: {result.test_id}\nError: {result.error_message}"
+            for i, result in enumerate(batch, 1)
+        )
+        prompt = f"""Analyze each of the following test failures and provide a concise summary of:
+1. What went wrong
+2. Possible root cause
+3. Suggested fix
+
+{failures}
+
+For each failure, provide a brief, actionable summary (2-3 sentences).
+Return ONLY a JSON object mapping each Test ID to its summary, no additional text."""
+
+        response = self.client.messages.create(
+            model=self.config.llm.model,
+            max_tokens=min(SUMMARY_MAX_TOKENS * len(batch), self.config.llm.max_tokens),
+            temperature=0.3,
+            messages=[{"role": "user", "content": prompt}],
+        )
+
+        response_text = response.content[0].text
+        if "```" in response_text:
+            response_text = response_text.split("```")[1].removeprefix("json")
+
+        summaries = parse_json(response_text.strip())
+        if not isinstance(summaries, dict):
+            raise ValueError("expected a JSON object of summaries")
+        return summaries
+
     def _generate_single_summary(self, result: TestResult) -> str:
         """Generate AI summary for a single failure."""
         prompt = f"""Analyze this test failure and provide a concise summary of:
@@ -68,7 +161,7 @@ Provide a brief, actionable summary (2-3 sentences)."""
 
         response = self.client.messages.create(
             model=self.config.llm.model,
-            max_tokens=500,
+            max_tokens=min(SUMMARY_MAX_TOKENS, self.config.llm.max_tokens),
             temperature=0.3,
             messages=[{"role": "user", "content": prompt}],
         )
@@ -80,39 +173,24 @@ Provide a brief, actionable summary (2-3 sentences)."""
         # Summary stats
         pass_rate = (test_run.passed / test_run.total * 100) if test_run.total > 0 else 0
 
-        # Generate test results HTML
+        # Generate test results HTML; test IDs, error messages and AI summaries come
+        # from generated tests, the browser and the LLM, so they are escaped
         results_html = []
         for result in test_run.results:
-            status_class = result.status.value
-            status_emoji = {
-                TestStatus.PASSED: "✓",
-                TestStatus.FAILED: "✗",
-                TestStatus.SKIPPED: "⊘",
-            }.get(result.status, "?")
-
             error_html = ""
             if result.status == TestStatus.FAILED:
-                ai_summary = failure_summaries.get(result.test_id, "No summary available")
-                error_html = f"""
-                    <div class="error-details">
-                        <h4>AI Analysis</h4>
-                        <p>{ai_summary}</p>
-                        <h4>Error Message</h4>
-                        <pre>{result.error_message or 'No error message'}</pre>
-                    </div>
-                """
-
-            result_html = f"""
-                <div class="test-result {status_class}">
-                    <div class="result-header">
-                        <span class="status-icon">{status_emoji}</span>
-                        <span class="test-name">{result.test_id}</span>
-                        <span class="duration">{result.duration_ms}ms</span>
-                    </div>
-                    {error_html}
-                </div>
-            """
-            results_html.append(result_html)
+                error_html = ERROR_DETAILS_TEMPLATE.substitute(
+                    ai_summary=escape(failure_summaries.get(result.test_id, "No summary available")),
+                    error_message=escape(result.error_message or 'No error message'),
+                )
+
+            results_html.append(RESULT_TEMPLATE.substitute(
+                status_class=result.status.value,
+                status_emoji=STATUS_EMOJI.get(result.status, "?"),
+                test_id=escape(result.test_id),
+                duration_ms=result.duration_ms,
+                error_html=error_html,
+            ))
 
         # Render template
         html = HTML_REPORT_TEMPLATE.format(
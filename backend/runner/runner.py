@@ -60,8 +60,7 @@ class TestRunner:
 
     def _create_playwright_config(self, artifacts_dir: Path) -> str:
         """Generate Playwright configuration."""
-        # Get timeout from config, default to 60000ms (60s)
-        timeout = getattr(self.config.runner, 'timeout', 60000)
+        timeout = self.config.runner.timeout
 
         config = f"""
 import {{ defineConfig, devices }} from '@playwright/test';
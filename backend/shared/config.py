@@ -3,7 +3,7 @@
 import json
 import os
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Literal, Optional
 from pydantic import BaseModel
 from pydantic_settings import BaseSettings
 
@@ -15,23 +15,40 @@ class LLMConfig(BaseModel):
     api_key: str = ""  # Can be empty if using environment variable
     max_tokens: int = 4096
     temperature: float = 0.7
+    cache_enabled: bool = False  # Reuse responses for identical generation requests
+    max_pages_per_call: int = 50  # Larger app maps are split across several generation calls
+    summary_batch_size: int = 20  # Failed tests summarized together in one report call
 
 
 class CrawlerConfig(BaseModel):
     """Crawler configuration."""
+    browser: Literal["chromium", "firefox", "webkit"] = "chromium"
     max_depth: int = 3
     max_pages: int = 50
     timeout: int = 30000
     screenshot: bool = True
+    screenshot_type: str = "png"  # "jpeg" gives much smaller files at reduced fidelity
     viewport: Dict[str, int] = {"width": 1280, "height": 720}
     page_delay_ms: int = 300
+    concurrency: int = 4  # Pages crawled in parallel
     skip_embeddings: bool = True
+    # Regex -> priority; lower values are crawled first. Unmatched URLs use their depth.
+    priority_rules: Dict[str, int] = {}
+    # Playwright resource types aborted during crawls. Any entry installs a request route, which
+    # disables the browser's HTTP cache and sends every request through Python, so shared JS/CSS
+    # is re-downloaded for each page. With Chromium and screenshots off, "image" is handled by a
+    # launch flag instead. Blocked images can hide image-only links and buttons from the analyzer.
+    blocked_resource_types: List[str] = []
+    respect_robots_txt: bool = True
+    # Fetch the first 64 KiB over HTTP to spot already-crawled canonical URLs before a browser load
+    precheck_canonical: bool = False
 
 
 class RunnerConfig(BaseModel):
     """Test runner configuration."""
     browser: str = "chromium"
     headless: bool = True
+    timeout: int = 60000  # Per-test timeout (ms)
     trace: bool = True
     video: bool = True
     screenshot: str = "only-on-failure"
@@ -43,6 +60,7 @@ class StorageConfig(BaseModel):
     app_maps_path: str = "./backend/app_maps"
     test_specs_path: str = "./backend/test_specs"
     reports_path: str = "./backend/reports"
+    llm_cache_path: str = "./backend/llm_cache"
 
 
 class APIConfig(BaseModel):
@@ -57,6 +75,8 @@ class Neo4jConfig(BaseModel):
     uri: str = "neo4j://localhost:7687"
     user: str = "neo4j"
     password: str
+    max_connection_pool_size: int = 100
+    max_connection_lifetime: int = 3600  # Seconds; recycle before server-side idle timeouts
 
 
 class Config(BaseSettings):
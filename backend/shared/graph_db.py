@@ -10,9 +10,29 @@ import json
 class GraphDB:
     """Manages Neo4j graph database operations for website crawl data."""
 
-    def __init__(self, uri: str, user: str, password: str):
-        """Initialize Neo4j driver connection."""
-        self.driver: Driver = GraphDatabase.driver(uri, auth=(user, password))
+    def __init__(self, uri: str, user: str, password: str,
+                 max_connection_pool_size: int = 100,
+                 max_connection_lifetime: int = 3600):
+        """
+        Initialize Neo4j driver connection.
+
+        Sessions opened by each method borrow warm connections from the driver's
+        pool, so keep one GraphDB per crawl rather than one per call. Sessions are
+        not thread-safe, which is why methods don't share a long-lived session.
+
+        Args:
+            uri: Neo4j connection URI
+            user: Database user
+            password: Database password
+            max_connection_pool_size: Upper bound on pooled connections
+            max_connection_lifetime: Seconds before a pooled connection is recycled
+        """
+        self.driver: Driver = GraphDatabase.driver(
+            uri,
+            auth=(user, password),
+            max_connection_pool_size=max_connection_pool_size,
+            max_connection_lifetime=max_connection_lifetime,
+        )
         self._create_constraints()
 
     def _create_constraints(self):
@@ -67,7 +87,8 @@ class GraphDB:
     def add_page(self, crawl_id: str, url: str, title: str, depth: int,
                  screenshot_path: Optional[str] = None,
                  content_data: Optional[Dict[str, Any]] = None,
-                 embedding: Optional[List[float]] = None) -> str:
+                 embedding: Optional[List[float]] = None,
+                 page_id: Optional[str] = None) -> str:
         """
         Add a page node to the graph with rich content data.
 
@@ -79,6 +100,7 @@ class GraphDB:
             screenshot_path: Optional path to screenshot
             content_data: Optional dict with meta_description, content_text, headers, etc.
             embedding: Optional embedding vector for semantic search
+            page_id: Optional pre-generated ID; a random UUID is used if omitted
 
         Returns:
             page_id: Unique identifier for this page
@@ -103,7 +125,7 @@ class GraphDB:
             result = session.run("""
                 MATCH (c:Crawl {crawl_id: $crawl_id})
                 CREATE (p:Page {
-                    page_id: randomUUID(),
+                    page_id: coalesce($page_id, randomUUID()),
                     crawl_id: $crawl_id,
                     url: $url,
                     title: $title,
@@ -124,7 +146,7 @@ class GraphDB:
                screenshot_path=screenshot_path, meta_description=meta_description,
                content_text=content_text, content_length=content_length,
                link_count=link_count, image_count=image_count,
-               headers_json=headers_json, embedding=embedding or [])
+               headers_json=headers_json, embedding=embedding or [], page_id=page_id)
             return result.single()["page_id"]
 
     def add_element(self, page_id: str, selector: str, selector_strategy: str,
@@ -161,6 +183,58 @@ class GraphDB:
                element_type=element_type, text=text, attributes=json.dumps(attributes or {}))
             return result.single()["element_id"]
 
+    def add_elements_bulk(self, page_id: str, rows: List[Dict[str, Any]]) -> int:
+        """
+        Add many elements (and their actions) to a page in a single query.
+
+        Args:
+            page_id: Page these elements belong to
+            rows: Dicts with selector, selector_strategy, element_type, text,
+                  attributes, and an optional list of action type strings
+
+        Returns:
+            Number of elements created
+        """
+        if not rows:
+            return 0
+
+        params = [
+            {
+                "selector": row["selector"],
+                "selector_strategy": row["selector_strategy"],
+                "element_type": row["element_type"],
+                "text": row.get("text"),
+                "attributes": json.dumps(row.get("attributes") or {}),
+                "actions": row.get("actions") or [],
+            }
+            for row in rows
+        ]
+
+        with self.driver.session() as session:
+            session.run("""
+                MATCH (p:Page {page_id: $page_id})
+                UNWIND $rows AS row
+                CREATE (e:Element {
+                    element_id: randomUUID(),
+                    selector: row.selector,
+                    selector_strategy: row.selector_strategy,
+                    element_type: row.element_type,
+                    text: row.text,
+                    attributes: row.attributes
+                })
+                CREATE (p)-[:HAS_ELEMENT]->(e)
+                WITH e, row
+                UNWIND row.actions AS action_type
+                CREATE (a:Action {
+                    action_id: randomUUID(),
+                    action_type: action_type,
+                    target_url: null,
+                    value: null
+                })
+                CREATE (e)-[:CAN_PERFORM]->(a)
+            """, page_id=page_id, rows=params)
+        return len(params)
+
     def add_action(self, element_id: str, action_type: str,
                    target_url: Optional[str] = None, value: Optional[str] = None):
         """
@@ -202,6 +276,29 @@ class GraphDB:
                 ON CREATE SET l.link_text = $link_text, l.created_at = datetime()
             """, from_page_id=from_page_id, to_page_id=to_page_id, link_text=link_text)
 
+    def link_pages_bulk(self, links: List[Dict[str, Any]]) -> int:
+        """
+        Create many navigation links in a single query.
+
+        Args:
+            links: Dicts with from_page_id, to_page_id and optional link_text
+
+        Returns:
+            Number of links submitted
+        """
+        if not links:
+            return 0
+
+        with self.driver.session() as session:
+            session.run("""
+                UNWIND $links AS link
+                MATCH (from:Page {page_id: link.from_page_id})
+                MATCH (to:Page {page_id: link.to_page_id})
+                MERGE (from)-[l:LINKS_TO]->(to)
+                ON CREATE SET l.link_text = link.link_text, l.created_at = datetime()
+            """, links=links)
+        return len(links)
+
     def mark_crawl_complete(self, crawl_id: str):
         """Mark a crawl as completed."""
         with self.driver.session() as session:
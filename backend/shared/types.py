@@ -85,6 +85,7 @@ class TestStep(BaseModel):
     expected_outcome: Optional[str] = None
     url: Optional[str] = None  # For goto action
     assertion: Optional[str] = None  # For expect action
+    timeout: Optional[int] = None  # For expect action (ms)
 
 
 class TestCase(BaseModel):
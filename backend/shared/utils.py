@@ -3,8 +3,16 @@
 import hashlib
 import json
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict
+from urllib.parse import urlsplit, urlunsplit
+
+try:
+    # Optional C-accelerated JSON; the stdlib json module is used when it is missing
+    import orjson
+except ImportError:
+    orjson = None
 
 
 def generate_id(prefix: str = "") -> str:
@@ -20,15 +28,29 @@ def get_timestamp() -> str:
     return datetime.utcnow().isoformat()
 
 
+def parse_json(text: str) -> Any:
+    """Parse a JSON string, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
 def save_json(data: Any, file_path: Path) -> None:
     """Save data as JSON to file."""
     file_path.parent.mkdir(parents=True, exist_ok=True)
+    if orjson is not None:
+        file_path.write_bytes(
+            orjson.dumps(data, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        )
+        return
     with open(file_path, "w") as f:
         json.dump(data, f, indent=2, default=str)
 
 
 def load_json(file_path: Path) -> Dict[str, Any]:
     """Load JSON data from file."""
+    if orjson is not None:
+        return orjson.loads(file_path.read_bytes())
     with open(file_path, "r") as f:
         return json.load(f)
 
@@ -42,6 +64,19 @@ def sanitize_filename(name: str) -> str:
     return name.strip()
 
 
+@lru_cache(maxsize=8192)
+def canonicalize_url(url: str) -> str:
+    """Normalize a URL to the identity used for crawl deduplication.
+
+    Lowercases the scheme and host and drops the query, fragment and
+    trailing slash, so variants of the same page compare equal. Results are
+    cached since navigation links repeat on nearly every crawled page.
+    """
+    parts = urlsplit(url.strip())
+    path = parts.path.rstrip("/")
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, "", ""))
+
+
 def format_duration(ms: int) -> str:
     """Format duration in milliseconds to human-readable string."""
     if ms < 1000:
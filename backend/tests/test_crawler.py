@@ -0,0 +1,102 @@
+"""Tests for the crawler's worker pool."""
+
+import asyncio
+import itertools
+import uuid
+
+import pytest
+
+pytest.importorskip("httpx")
+pytest.importorskip("playwright")
+
+from backend.crawler import crawler as crawler_module
+from backend.crawler.crawler import Crawler
+from backend.shared.config import (
+    APIConfig, Config, CrawlerConfig, LLMConfig, Neo4jConfig, RunnerConfig, StorageConfig,
+)
+
+
+class FakeContext:
+    """Browser context whose calls yield to the event loop like the real ones."""
+
+    def __init__(self):
+        self.pages = []
+
+    async def add_init_script(self, script):
+        await asyncio.sleep(0)
+
+    async def route(self, pattern, handler):
+        await asyncio.sleep(0)
+
+    async def new_page(self):
+        await asyncio.sleep(0)
+        return object()
+
+    async def clear_cookies(self):
+        await asyncio.sleep(0)
+
+    async def close(self):
+        pass
+
+
+class FakeBrowser:
+    async def new_context(self, **kwargs):
+        await asyncio.sleep(0)
+        return FakeContext()
+
+
+def make_crawler(monkeypatch, max_pages, concurrency):
+    config = Config(
+        llm=LLMConfig(),
+        crawler=CrawlerConfig(
+            max_pages=max_pages,
+            concurrency=concurrency,
+            page_delay_ms=0,
+            respect_robots_txt=False,
+        ),
+        runner=RunnerConfig(),
+        storage=StorageConfig(),
+        neo4j=Neo4jConfig(password="unused"),
+        api=APIConfig(),
+    )
+    monkeypatch.setattr(crawler_module, "get_config", lambda: config)
+    crawler = Crawler(graph_db=None)
+
+    # Per-crawl state normally set up by crawl()
+    crawler._frontier = asyncio.PriorityQueue()
+    crawler._seq = itertools.count()
+    crawler._queued = set()
+    crawler._in_flight = 0
+    crawler._robots = None
+    crawler._blocked_types = frozenset()
+
+    async def crawl_page(page, url, depth):
+        await asyncio.sleep(0.01)
+        return str(uuid.uuid4())
+
+    crawler._crawl_page = crawl_page
+    return crawler
+
+
+@pytest.mark.parametrize("max_pages", [1, 3, 20])
+def test_concurrent_workers_respect_max_pages(monkeypatch, max_pages):
+    crawler = make_crawler(monkeypatch, max_pages=max_pages, concurrency=8)
+
+    async def run():
+        for i in range(50):
+            crawler._enqueue(f"https://example.com/page-{i}", 1)
+        workers = [
+            asyncio.create_task(crawler._worker(FakeBrowser(), "https://example.com"))
+            for _ in range(8)
+        ]
+        await crawler._frontier.join()
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+    asyncio.run(run())
+
+    # Never more than max_pages, and slots held during page cleanup must not undercount either
+    assert len(crawler.visited_urls) <= max_pages
+    assert len(crawler.visited_urls) == max_pages
+    assert crawler._in_flight == 0